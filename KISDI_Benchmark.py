@@ -0,0 +1,399 @@
+import sys
+import os
+
+# 예산 보고서 추출기 벤치마크
+# 실제 예산 시트(B, D~L열)와 같은 배치의 가상 통합문서를 만들고, 단계별 소요 시간을 잽니다.
+#
+# 사용 예)
+#   python KISDI_Benchmark.py                                    → 기본 규모로 측정, bench_result.json 저장
+#   python KISDI_Benchmark.py --scales small,large --repeat 5
+#   python KISDI_Benchmark.py --save-baseline bench_baseline.json → 기준값 저장
+#   python KISDI_Benchmark.py --baseline bench_baseline.json      → 기준보다 느려진 단계 표시 (실패 시 종료 코드 1)
+#   python KISDI_Benchmark.py --scales "" --startup-budget 0.8     → 시작 시간만 재고 예산을 넘으면 종료 코드 1
+#   python KISDI_Benchmark.py --io-latency 0.2                    → 느린 네트워크 드라이브에서 여러 파일 처리 비교
+
+import io
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import platform
+import subprocess
+
+import openpyxl
+import pandas as pd
+
+import KISDI_Budget as kb
+
+
+# 규모별 생성 옵션 (중분류 수, 중분류당 항목 수, 시트 오른쪽에 붙일 계산용 열 수)
+SCALES = {
+    "small": {"categories": 10, "items": 50, "extra_columns": 0},
+    "medium": {"categories": 40, "items": 500, "extra_columns": 10},
+    "large": {"categories": 100, "items": 2000, "extra_columns": 20},
+}
+
+STAGES = ["read", "coerce", "group", "render", "tree_fill", "append", "consolidate"]
+STARTUP_STAGES = ["cold_start", "import", "deferred"]
+
+# 새 프로세스에서 창을 띄우기 전까지(파이썬 시작 + KISDI_Budget import) 허용하는 시간(초)
+STARTUP_BUDGET = 1.0
+
+# 여러 파일 처리: 파일 수와 파일 읽기/쓰기마다 더하는 지연(초, 네트워크 드라이브 흉내)
+PIPELINE_FILES = 12
+IO_LATENCY = 0.05
+
+UNITS = ["명", "월", "회", "식", "부", "개", "일"]
+ITEM_NAMES = ["인쇄비", "복사료", "회의비", "자문료", "여비", "사업인건비", "임차료", "소모품비", "원고료", "번역료"]
+CATEGORY_NAMES = ["사업인건비", "일반수용비", "여비", "업무추진비", "연구용역비", "임차료", "자산취득비"]
+
+
+def make_budget_workbook(file_path, categories=10, items=50, dash_ratio=0.3, empty_ratio=0.1,
+                         unit_ratio=0.8, extra_columns=0, header_rows=3, seed=0):
+    """
+    parse_excel 이 읽는 배치(B열 중분류, D~L열 항목)의 가상 예산 통합문서를 만듭니다.
+    - dash_ratio: 항목명이 "-" 로 시작해 앞 항목명을 물려받는 행 비율
+    - empty_ratio: 금액이 비어 있거나 0 인 행 비율
+    - unit_ratio: 갯수/횟수에 단위가 붙는 비율
+    - extra_columns: L열 오른쪽에 붙일 계산용 열 수 (시트 크기 조절)
+    만든 행 수를 반환합니다.
+    """
+    rnd = random.Random(seed)
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("예산")
+    extra = [None] * extra_columns
+
+    def unit():
+        return rnd.choice(UNITS) if rnd.random() < unit_ratio else None
+
+    rows = 0
+    for idx in range(header_rows):
+        ws.append(["", "예산 내역" if idx == 0 else None, None, "항목", "단가", "갯수", None, "횟수", None, "횟수", None, "금액"])
+        rows += 1
+
+    for cat in range(1, categories + 1):
+        ws.append([None, f"{cat}) {rnd.choice(CATEGORY_NAMES)}"] + [None] * 10 + extra)
+        rows += 1
+        for item in range(items):
+            if item > 0 and rnd.random() < dash_ratio:
+                name = f"- {rnd.choice(ITEM_NAMES)} 세부"
+            else:
+                name = rnd.choice(ITEM_NAMES)
+            unit_price = rnd.choice([1000, 5000, 12000, 50000, 150000, 1500.5])
+            qty = rnd.choice([1, 2, 3, 5, 10, 2.5])
+            freq1 = rnd.choice([None, 1, 2, 12])
+            freq2 = rnd.choice([None, None, 1, 3])
+            amount = unit_price * qty * (freq1 or 1) * (freq2 or 1)
+            if rnd.random() < empty_ratio:
+                amount = rnd.choice([None, 0])
+            calc = [rnd.random() for _ in range(extra_columns)]
+            ws.append([None, None, None, name, unit_price, qty, unit(), freq1, unit(), freq2, unit(), amount] + calc)
+            rows += 1
+
+    wb.save(file_path)
+    return rows
+
+
+def timed(func, repeat):
+    """
+    func 를 repeat 번 실행해 가장 짧은 시간과 마지막 결과를 반환합니다.
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def tree_fill_time(parsed_data, repeat):
+    """
+    실제 Treeview 에 보고서 행을 채우는 시간을 잽니다. 화면이 없으면 None 을 반환합니다.
+    """
+    try:
+        import tkinter as tk
+        from tkinter import ttk
+        root = tk.Tk()
+    except Exception:
+        return None
+    try:
+        root.withdraw()
+        tree = ttk.Treeview(root, columns=("col_cat", "col_desc", "col_amount"), show="headings")
+        vsb = ttk.Scrollbar(root, orient="vertical")
+        tree.pack()
+        table = kb.ReportTable(tree, vsb)
+
+        def fill():
+            table.set_rows(kb.report_rows(parsed_data))
+            while table.fill_id is not None:
+                root.update()
+
+        return timed(fill, repeat)[0]
+    finally:
+        root.destroy()
+
+
+def parse_importtime(stderr, module="KISDI_Budget"):
+    """
+    -X importtime 출력에서 (module 을 불러오는 시간, module 이 직접 불러온 모듈 목록, 이후에 불러온 시간)을 구합니다.
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # 머리글 줄
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((depth, name.strip(), int(cumulative) / 1e6))
+
+    position = next(idx for idx, (depth, name, _) in enumerate(entries) if depth == 0 and name == module)
+    children = []
+    for depth, name, seconds in reversed(entries[:position]):
+        if depth == 0:
+            break
+        if depth == 1:
+            children.append((name, seconds))
+    deferred = sum(seconds for depth, _, seconds in entries[position + 1:] if depth == 0)
+    return entries[position][2], sorted(children, key=lambda child: -child[1]), deferred
+
+def startup_time(repeat, top=10):
+    """
+    새 파이썬 프로세스에서 KISDI_Budget 을 불러오는 시간(창이 뜨기 전 비용)과
+    창이 뜬 뒤 백그라운드에서 불러오는 pandas/openpyxl 시간을 잽니다.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import KISDI_Budget"], cwd=here, check=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    done = subprocess.run([sys.executable, "-X", "importtime", "-c", "import KISDI_Budget; KISDI_Budget.preload_modules()"],
+                          cwd=here, check=True, capture_output=True, text=True)
+    import_seconds, children, deferred = parse_importtime(done.stderr)
+    return {
+        "stages": {"cold_start": best, "import": import_seconds, "deferred": deferred},
+        "top": children[:top],
+    }
+
+def pipeline_time(work_dir, files, latency, options=SCALES["small"]):
+    """
+    같은 통합문서 files 개를 읽기 → 파싱 → 통합 기록하는 시간을,
+    파일마다 차례로 처리할 때(BackgroundJob)와 단계를 겹칠 때(PipelineJob) 비교합니다.
+    """
+    source = os.path.join(work_dir, "pipeline.xlsx")
+    make_budget_workbook(source, **options)
+    paths = []
+    for idx in range(files):
+        path = os.path.join(work_dir, f"pipeline_{idx}.xlsx")
+        shutil.copyfile(source, path)
+        paths.append(path)
+
+    def read(file_path, timer):
+        time.sleep(latency)
+        return kb.read_file_bytes(file_path)
+
+    def parse(file_path, timer, prefetched):
+        data, _ = prefetched
+        return kb.parse_file(file_path, timer=timer, source=io.BytesIO(data))
+
+    def run(pipelined):
+        writer = kb.ConsolidatedWriter(os.path.join(work_dir, "pipeline_out.xlsx"))
+
+        def write(file_path, parsed_data, timer):
+            time.sleep(latency)
+            writer.append(file_path, parsed_data)
+
+        if pipelined:
+            job = kb.PipelineJob("pipelined", paths, read, parse, write)
+        else:
+            job = kb.BackgroundJob("sequential", paths, kb.chain_stages(read, parse, write))
+        start = time.perf_counter()
+        job.start()
+        job.thread.join()
+        writer.close()
+        elapsed = time.perf_counter() - start
+        errors = [message[5] for message in job.messages() if message[0] == "file" and message[5]]
+        if errors:
+            raise RuntimeError(errors[0])
+        return elapsed
+
+    return {
+        "files": files,
+        "latency": latency,
+        "stages": {"sequential": run(False), "pipelined": run(True)},
+    }
+
+
+def bench_scale(name, options, work_dir, repeat, consolidate_files):
+    """
+    한 규모의 통합문서를 만들고 단계별 시간을 잽니다.
+    """
+    source = os.path.join(work_dir, f"{name}.xlsx")
+    rows = make_budget_workbook(source, **options)
+
+    read_time, df = timed(lambda: pd.read_excel(source, header=None), repeat)
+    coerce_time, needed = timed(lambda: kb.select_needed(df), repeat)
+    group_time, parsed_data = timed(lambda: kb.parse_columns(needed), repeat)
+
+    # 렌더링: 항목 문자열 생성(render_lines) + 최종 보고서 텍스트
+    render_time, _ = timed(lambda: kb.build_final_report(parsed_data), repeat)
+
+    tree_time = tree_fill_time(parsed_data, repeat)
+
+    # 시트 추가는 원본을 바꾸므로 매번 새 사본에 실행
+    def append():
+        target = os.path.join(work_dir, f"{name}_append.xlsx")
+        shutil.copyfile(source, target)
+        start = time.perf_counter()
+        kb.append_report_sheet(target, parsed_data)
+        return time.perf_counter() - start
+    append_time = min(append() for _ in range(repeat))
+
+    output = os.path.join(work_dir, f"{name}_consolidated.xlsx")
+    consolidate_time, _ = timed(
+        lambda: kb.write_consolidated(output, ((f"{name}_{idx}.xlsx", parsed_data) for idx in range(consolidate_files))),
+        repeat,
+    )
+
+    return {
+        "rows": rows,
+        "categories": len(parsed_data),
+        "items": kb.count_items(parsed_data),
+        "stages": {
+            "read": read_time,
+            "coerce": coerce_time,
+            "group": group_time,
+            "render": render_time,
+            "tree_fill": tree_time,
+            "append": append_time,
+            "consolidate": consolidate_time,
+        },
+    }
+
+
+def compare(result, baseline, threshold):
+    """
+    기준값보다 threshold 비율 이상 느려진 (규모, 단계, 기준, 현재) 목록을 반환합니다.
+    시작 시간과 여러 파일 처리 시간은 "startup", "pipeline" 규모로 함께 비교합니다.
+    """
+    groups = list(result["scales"].items())
+    base_groups = dict(baseline.get("scales", {}))
+    for extra in ("startup", "pipeline"):
+        if extra in result and extra in baseline:
+            groups.append((extra, result[extra]))
+            base_groups[extra] = baseline[extra]
+    regressions = []
+    for scale, data in groups:
+        base_stages = base_groups.get(scale, {}).get("stages", {})
+        for stage, seconds in data["stages"].items():
+            base = base_stages.get(stage)
+            if seconds is None or not base:
+                continue
+            if seconds > base * (1 + threshold):
+                regressions.append((scale, stage, base, seconds))
+    return regressions
+
+
+def print_table(result):
+    print(f"{'규모':<8}{'행':>9}" + "".join(f"{stage:>13}" for stage in STAGES))
+    for scale, data in result["scales"].items():
+        cells = []
+        for stage in STAGES:
+            seconds = data["stages"][stage]
+            cells.append(f"{'-':>13}" if seconds is None else f"{seconds:>12.4f}s")
+        print(f"{scale:<8}{data['rows']:>9,}" + "".join(cells))
+
+def print_startup(startup, budget):
+    stages = startup["stages"]
+    print(f"시작: 프로세스 {stages['cold_start']:.3f}s (예산 {budget:.2f}s) · 모듈 import {stages['import']:.3f}s"
+          f" · 창 표시 후 불러오기 {stages['deferred']:.3f}s")
+    for name, seconds in startup["top"]:
+        print(f"  {seconds:>8.4f}s  {name}")
+
+def print_pipeline(pipeline):
+    stages = pipeline["stages"]
+    print(f"여러 파일 {pipeline['files']}개 (읽기/쓰기 지연 {pipeline['latency']:.2f}s): "
+          f"차례로 {stages['sequential']:.3f}s · 단계 겹침 {stages['pipelined']:.3f}s "
+          f"({stages['sequential'] / stages['pipelined']:.1f}배)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="예산 보고서 추출기 단계별 벤치마크")
+    parser.add_argument("--scales", default="small,medium", help=f"측정할 규모 (쉼표 구분, {', '.join(SCALES)})")
+    parser.add_argument("--repeat", type=int, default=3, help="단계별 반복 횟수 (가장 짧은 시간을 사용)")
+    parser.add_argument("--consolidate-files", type=int, default=20, help="통합 저장 단계에서 이어 쓸 파일 수")
+    parser.add_argument("--out", default="bench_result.json", help="결과 JSON 경로")
+    parser.add_argument("--baseline", help="비교할 기준 JSON 경로")
+    parser.add_argument("--threshold", type=float, default=0.2, help="기준 대비 허용 비율 (0.2 = 20%% 느려지면 회귀)")
+    parser.add_argument("--save-baseline", help="이번 결과를 기준 JSON 으로도 저장")
+    parser.add_argument("--startup-budget", type=float, default=STARTUP_BUDGET,
+                        help="새 프로세스에서 KISDI_Budget 을 불러오기까지 허용하는 시간(초), 넘으면 종료 코드 1")
+    parser.add_argument("--pipeline-files", type=int, default=PIPELINE_FILES,
+                        help="여러 파일 처리(차례로/단계 겹침) 비교에 쓸 파일 수 (0 이면 생략)")
+    parser.add_argument("--io-latency", type=float, default=IO_LATENCY,
+                        help="여러 파일 처리에서 파일 읽기/쓰기마다 더할 지연(초), 네트워크 드라이브 흉내")
+    args = parser.parse_args(argv)
+
+    scales = [scale.strip() for scale in args.scales.split(",") if scale.strip()]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        parser.error(f"알 수 없는 규모: {', '.join(unknown)}")
+
+    result = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "openpyxl": openpyxl.__version__,
+        "repeat": args.repeat,
+        "scales": {},
+    }
+    print("[startup] 측정 중...")
+    result["startup"] = startup_time(args.repeat)
+    with tempfile.TemporaryDirectory() as work_dir:
+        for scale in scales:
+            print(f"[{scale}] 측정 중...")
+            result["scales"][scale] = bench_scale(scale, SCALES[scale], work_dir, args.repeat, args.consolidate_files)
+        if args.pipeline_files > 0:
+            print("[pipeline] 측정 중...")
+            result["pipeline"] = pipeline_time(work_dir, args.pipeline_files, args.io_latency)
+
+    print_startup(result["startup"], args.startup_budget)
+    if "pipeline" in result:
+        print_pipeline(result["pipeline"])
+    if result["scales"]:
+        print_table(result)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {args.out}")
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"기준 저장: {args.save_baseline}")
+
+    failed = False
+    if result["startup"]["stages"]["cold_start"] > args.startup_budget:
+        print(f"시작 시간이 예산({args.startup_budget:.2f}s)을 넘었습니다.")
+        failed = True
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.threshold)
+        if regressions:
+            print(f"기준보다 {args.threshold:.0%} 넘게 느려진 단계:")
+            for scale, stage, base, seconds in regressions:
+                print(f"- {scale}/{stage}: {base:.4f}s → {seconds:.4f}s ({seconds / base - 1:+.0%})")
+            return 1
+        print("기준 대비 느려진 단계가 없습니다.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
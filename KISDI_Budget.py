@@ -12,8 +12,67 @@ import os
 
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
-import pandas as pd
+import importlib
+import io
+import array
 import re
+import glob
+import json
+import hashlib
+import logging
+import contextlib
+import cProfile
+import queue
+import copy
+import shutil
+import zipfile
+import tempfile
+import posixpath
+import sqlite3
+import threading
+import time
+import argparse
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# 창 표시까지 걸린 시간을 재기 위한 시작 시각
+STARTED = time.perf_counter()
+
+
+class LazyModule:
+    """
+    처음 속성을 읽을 때 모듈을 불러옵니다.
+    pandas/openpyxl 은 불러오는 데 몇 초가 걸리므로 창을 먼저 띄우고 나중에(또는 백그라운드에서) 불러옵니다.
+    """
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        # 찾은 속성은 인스턴스에 남겨 두어 다음부터는 __getattr__ 를 거치지 않게 함 (pd./np. 는 반복문에서도 자주 읽음)
+        value = getattr(self.load(), attr)
+        self.__dict__[attr] = value
+        return value
+
+pd = LazyModule("pandas")
+np = LazyModule("numpy")
+openpyxl = LazyModule("openpyxl")
+openpyxl_utils = LazyModule("openpyxl.utils")
+saxutils = LazyModule("xml.sax.saxutils")
+logging_handlers = LazyModule("logging.handlers")
+
+def preload_modules():
+    """
+    무거운 모듈을 미리 불러옵니다. 창이 뜬 뒤 백그라운드 스레드에서 호출합니다.
+    """
+    for module in (np, pd, openpyxl, openpyxl_utils, saxutils, logging_handlers):
+        module.load()
 
 
 
@@ -54,10 +113,269 @@ def make_expression(item_name, unit_price, qty, qty_unit, freq1, freq1_unit, fre
 
     return f"- {item_name} : {expr_str}={amount_str}"
 
-def parse_excel(file_path):
+def format_unique(values, func):
+    """
+    Series 의 서로 다른 값마다 한 번씩만 func 로 문자열을 만들어 열 전체에 펼칩니다. (NaN 은 "")
+    """
+    codes, uniques = pd.factorize(values)
+    formatted = np.array([func(v) for v in uniques.tolist()] + [""], dtype=object)
+    return formatted[codes]
+
+def make_expressions(item_name, unit_price, qty, qty_unit, freq1, freq1_unit, freq2, freq2_unit, amount):
+    """
+    make_expression 의 열 단위 버전입니다. 인자는 모두 같은 인덱스의 Series 이며,
+    단가/갯수/횟수/금액 열을 각각 한 번에 문자열로 바꾼 뒤 열끼리 이어 붙입니다.
+    결과 문자열은 make_expression 과 완전히 같습니다.
+    """
+    size = len(amount)
+
+    def part(values, unit, with_unit, without_unit):
+        # 값이 있고 0 이 아닌 행만 "값+단위" 또는 "값" 으로 채우고 나머지는 ""
+        text = np.full(size, "", dtype=object)
+        present = (values.notna() & (values != 0)).to_numpy()
+        has_unit = unit.notna().to_numpy()
+        mask = present & has_unit
+        if mask.any():
+            text[mask] = format_unique(values[mask], with_unit) + unit[mask].map(str).to_numpy(dtype=object)
+        mask = present & ~has_unit
+        if mask.any():
+            text[mask] = format_unique(values[mask], without_unit)
+        return text
+
+    price_text = np.full(size, "", dtype=object)
+    mask = unit_price.notna().to_numpy()
+    if mask.any():
+        price_text[mask] = format_unique(unit_price[mask], add_commas)
+
+    qty_text = part(qty, qty_unit, lambda v: str(int(v)), str)
+    freq1_text = part(freq1, freq1_unit, add_commas, add_commas)
+    freq2_text = part(freq2, freq2_unit, add_commas, add_commas)
+
+    # 값이 있는 부분만 "×" 로 연결
+    expr = price_text
+    for text in (qty_text, freq1_text, freq2_text):
+        expr = np.where(expr == "", text, np.where(text == "", expr, expr + "×" + text))
+
+    amount_text = format_unique(amount, lambda v: format(int(v), ",d"))
+    names = item_name.to_numpy(dtype=object)
+    return ("- " + names + " : " + expr + "=" + amount_text).tolist()
+
+# B열(중분류)과 D~L열(항목 상세)의 열 번호와 이름
+NEEDED_COLUMNS = [1, 3, 4, 5, 6, 7, 8, 9, 10, 11]
+NEEDED_NAMES = [
+    "raw_cat",     # B열
+    "항목명",      # D열
+    "단가",       # E열
+    "갯수",       # F열
+    "갯수단위",    # G열
+    "횟수1",      # H열
+    "횟수1단위",   # I열
+    "횟수2",      # J열
+    "횟수2단위",   # K열
+    "금액"        # L열
+]
+NUMERIC_NAMES = ["단가", "갯수", "횟수1", "횟수2", "금액"]
+
+# 중분류 판별용 정규식 ")" 닫는 괄호로 판단함
+CATEGORY_PATTERN = r"^\d+\)"
+
+
+# pd.read_excel 이 빈 값(NaN)으로 읽는 문자열과 엑셀 오류 값
+NA_STRINGS = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+    "#NULL!", "#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!",
+}
+# openpyxl 로 바로 읽을 수 있는 형식 (.xls 는 pandas 로 읽음)
+STREAM_EXTENSIONS = (".xlsx", ".xlsm")
+
+def clean_cell(value):
+    """
+    셀 값을 pd.read_excel 과 같은 규칙으로 정리합니다. (빈 값은 NaN, 정수인 실수는 정수)
+    """
+    if value is None or (isinstance(value, str) and value in NA_STRINGS):
+        return float("nan")
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def to_number(value):
+    """
+    pd.to_numeric(errors="coerce") 처럼 숫자로 바꾸고, 바꿀 수 없으면 NaN 을 반환합니다.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return float("nan")
+    return float("nan")
+
+def iter_worksheet_rows(ws):
+    """
+    워크시트에서 B, D~L 열만 한 행씩 정리해 내보냅니다.
+    """
+    for b, _, d, e, f, g, h, i, j, k, l in ws.iter_rows(min_col=2, max_col=12, values_only=True):
+        yield (
+            clean_cell(b),
+            clean_cell(d),
+            to_number(clean_cell(e)),
+            to_number(clean_cell(f)),
+            clean_cell(g),
+            to_number(clean_cell(h)),
+            clean_cell(i),
+            to_number(clean_cell(j)),
+            clean_cell(k),
+            to_number(clean_cell(l)),
+        )
+
+def iter_sheet_rows(file_path):
+    """
+    첫 번째 시트를 읽기 전용 모드로 열어 B, D~L 열만 한 행씩 내보냅니다.
+    시트 전체를 DataFrame 으로 만들지 않으므로 시트가 커도 메모리가 늘지 않습니다.
+    """
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        yield from iter_worksheet_rows(wb.worksheets[0])
+    finally:
+        wb.close()
+
+def iter_workbook_rows(file_path):
+    """
+    통합문서를 한 번만 열어 시트마다 (시트 이름, 행 제너레이터)를 내보냅니다.
+    행은 다음 시트로 넘어가기 전에 모두 읽어야 합니다.
+    L열까지 없는 시트는 예산 배치가 아니므로 건너뜁니다. (pandas 경로의 select_needed 와 같은 기준)
+    """
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            if has_needed_columns(ws):
+                yield ws.title, iter_worksheet_rows(ws)
+    finally:
+        wb.close()
+
+def has_needed_columns(ws):
+    """
+    읽기 전용 시트가 필요한 열(B, D~L)을 모두 덮는지 확인합니다.
+    크기 정보(dimension)가 없는 시트는 행을 훑어 크기를 구합니다.
+    """
+    if not ws.max_column:
+        ws.calculate_dimension(force=True)
+    return (ws.max_column or 0) > max(NEEDED_COLUMNS)
+
+def can_stream(file_path):
+    return file_path.lower().endswith(STREAM_EXTENSIONS)
+
+def select_needed(df):
+    """
+    읽어들인 시트에서 필요한 열(B, D~L)만 골라 이름을 붙이고 숫자 열을 변환합니다.
+    """
+    # 필요한 열 선택 및 이름 부여
+    try:
+        needed = df[NEEDED_COLUMNS].copy()
+        needed.columns = NEEDED_NAMES
+    except KeyError:
+        raise ValueError("엑셀 파일의 열 구조가 예상과 다릅니다.\n필요한 열(B, D, E, F, G, H, I, J, K, L)이 모두 있는지 확인하세요.")
+
+    # 숫자 변환
+    for col in NUMERIC_NAMES:
+        needed[col] = pd.to_numeric(needed[col], errors="coerce")
+    return needed
+
+def parse_needed(needed, engine="columnar"):
+    """
+    engine="columnar" 는 열 단위 연산으로, engine="rows" 는 기존 행 단위 루프로 파싱합니다.
+    (engine="stream" 은 DataFrame 을 거치지 않으므로 parse_file/parse_excel 에서 처리합니다.)
+    """
+    if engine == "rows":
+        return parse_rows(needed)
+    return parse_columns(needed)
+
+def tag_sheet(parsed_data, sheet_name):
+    """
+    각 중분류(Category)의 sheet 속성에 어느 시트에서 왔는지 적습니다.
+    """
+    for category in parsed_data:
+        category.sheet = sheet_name
+    return parsed_data
+
+def parse_sheet(sheet_name, df, engine="columnar"):
+    """
+    시트 하나를 파싱합니다. 예산 배치(B, D~L열, "1)" 형식의 중분류)가 아니면 빈 목록을 반환합니다.
+    """
+    try:
+        needed = select_needed(df)
+    except ValueError:
+        return []
+    return tag_sheet(parse_needed(needed, engine), sheet_name)
+
+def parse_sheets(file_path, engine="columnar", timer=None, source=None):
+    """
+    통합문서를 한 번만 열어 모든 시트를 읽고, 예산 배치인 시트를 동시에 파싱합니다.
+    결과는 시트 순서대로 이어 붙이며 중분류마다 sheet 속성에 시트 이름이 들어갑니다.
+    """
+    target = file_path if source is None else source
+    if engine == "stream" and can_stream(file_path):
+        # 읽기 전용 시트는 하나의 압축 파일 핸들을 공유하므로 차례로 읽음
+        with measure(timer, "stream") as record:
+            parsed_data = []
+            for sheet_name, rows in iter_workbook_rows(target):
+                parsed_data.extend(tag_sheet(list(iter_categories(rows)), sheet_name))
+            record["rows"] = count_items(parsed_data)
+        return parsed_data
+
+    with measure(timer, "read") as record:
+        sheets = pd.read_excel(target, sheet_name=None, header=None)
+        record["rows"] = sum(len(df) for df in sheets.values())
+    with measure(timer, "group") as record:
+        workers = max(1, min(len(sheets), os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(parse_sheet, list(sheets), list(sheets.values()), [engine] * len(sheets))
+            parsed_data = [item for result in results for item in result]
+        record["rows"] = count_items(parsed_data)
+    return parsed_data
+
+def parse_file(file_path, engine="columnar", timer=None, all_sheets=False, source=None):
+    """
+    GUI 없이 엑셀 파일을 파싱합니다. 오류는 대화상자 대신 예외로 전달됩니다.
+    timer(StageTimer) 를 주면 읽기/숫자 변환/분류 단계를 나누어 기록합니다.
+    all_sheets=True 이면 첫 시트만이 아니라 예산 배치인 모든 시트를 파싱합니다.
+    source 에 미리 읽어 둔 내용(BytesIO)을 주면 파일 대신 그것을 읽습니다. (형식은 file_path 확장자로 판단)
+    """
+    if all_sheets:
+        return parse_sheets(file_path, engine, timer, source)
+
+    target = file_path if source is None else source
+    if engine == "stream" and can_stream(file_path):
+        with measure(timer, "stream") as record:
+            parsed_data = list(iter_categories(iter_sheet_rows(target)))
+            record["rows"] = count_items(parsed_data)
+        return parsed_data
+
+    with measure(timer, "read") as record:
+        df = pd.read_excel(target, header=None)
+        record["rows"] = len(df)
+    with measure(timer, "coerce") as record:
+        needed = select_needed(df)
+        record["rows"] = len(needed)
+    with measure(timer, "group") as record:
+        parsed_data = parse_needed(needed, engine)
+        record["rows"] = count_items(parsed_data)
+    return parsed_data
+
+def parse_excel(file_path, engine="columnar"):
     """
     엑셀 파일을 파싱하여 중분류와 세부항목을 추출
+    engine="stream" 이면 필요한 열만 한 행씩 읽어 시트 전체를 메모리에 올리지 않습니다.
     """
+    if engine == "stream" and can_stream(file_path):
+        try:
+            return list(iter_categories(iter_sheet_rows(file_path)))
+        except Exception as e:
+            messagebox.showerror("파일 오류", f"엑셀 파일을 읽는 중 오류가 발생했습니다.\n{e}")
+            return []
+
     try:
         df = pd.read_excel(file_path, header=None)
         print("엑셀 파일을 성공적으로 읽었습니다.")
@@ -65,124 +383,2009 @@ def parse_excel(file_path):
         messagebox.showerror("파일 오류", f"엑셀 파일을 읽는 중 오류가 발생했습니다.\n{e}")
         return []
 
-    # 필요한 열 선택 및 이름 부여
     try:
-        needed = df[[1,3,4,5,6,7,8,9,10,11]].copy()
-        needed.columns = [
-            "raw_cat",     # B열
-            "항목명",      # D열
-            "단가",       # E열
-            "갯수",       # F열
-            "갯수단위",    # G열
-            "횟수1",      # H열
-            "횟수1단위",   # I열
-            "횟수2",      # J열
-            "횟수2단위",   # K열
-            "금액"        # L열
-        ]
-    except KeyError:
-        messagebox.showerror("열 오류", "엑셀 파일의 열 구조가 예상과 다릅니다.\n필요한 열(B, D, E, F, G, H, I, J, K, L)이 모두 있는지 확인하세요.")
+        needed = select_needed(df)
+    except ValueError as e:
+        messagebox.showerror("열 오류", str(e))
         return []
 
-    # 숫자 변환
-    for col in ["단가", "갯수", "횟수1", "횟수2", "금액"]:
-        needed[col] = pd.to_numeric(needed[col], errors="coerce")
+    return parse_needed(needed, engine)
+
+def parse_rows(needed):
+    """
+    행 단위 루프로 중분류와 항목을 파싱합니다. (parse_columns 의 기준 구현)
+    """
+    return list(iter_categories(needed.itertuples(index=False, name=None)))
+
+# Category 가 항목마다 보관하는 열 (make_expressions 인자 순서)
+ITEM_FIELDS = ("names", "unit_prices", "qtys", "qty_units", "freq1s", "freq1_units", "freq2s", "freq2_units", "amounts")
+NUMBER_FIELDS = ("unit_prices", "qtys", "freq1s", "freq2s", "amounts")
+TEXT_FIELDS = ("names", "qty_units", "freq1_units", "freq2_units")
+
+def number_array(values):
+    """
+    숫자 목록을 array 로 담습니다. 모두 정수이면 "q", 아니면 "d"(빈 값은 NaN) 로 저장합니다.
+    """
+    values = list(values)
+    if all(type(value) is int for value in values):
+        return array.array("q", values)
+    return array.array("d", values)
+
+def encode_texts(columns):
+    """
+    문자열 열들(항목명, 단위)을 (서로 다른 값 tuple, 값 번호 array) 로 바꿉니다.
+    같은 단위/항목명이 반복되므로 항목마다 문자열을 들고 있지 않아도 됩니다. 빈 값(NaN)은 None(0번)입니다.
+    문자열/숫자가 아닌 값(날짜 서식 셀 등)은 str() 로 바꿔 둡니다. (보고서 문자열은 같고 캐시/저장소에 그대로 쓸 수 있음)
+    """
+    table = {(type(None), None): 0}
+    codes = []
+    for column in columns:
+        for value in column:
+            if isinstance(value, float) and value != value:
+                value = None
+            elif value is not None and not isinstance(value, (str, int, float)):
+                value = str(value)
+            # 1 과 1.0 이 같은 번호가 되지 않도록 형식까지 구분
+            codes.append(table.setdefault((type(value), value), len(table)))
+    texts = tuple(value for _, value in table)
+    return texts, array.array("H" if len(texts) <= 0xFFFF else "I", codes)
+
+class Category:
+    """
+    중분류 하나의 파싱 결과입니다.
+    항목은 열마다 array 로 보관하고(숫자는 값, 항목명/단위는 texts 번호), 보고서 문자열은 표시/내보내기 때 만듭니다.
+    """
+    __slots__ = ("label", "sheet", "texts", "text_codes") + NUMBER_FIELDS
+
+    def __init__(self, label, names, unit_prices, qtys, qty_units, freq1s, freq1_units, freq2s, freq2_units,
+                 amounts, sheet=None):
+        self.label = label          # e.g., "1. 사업인건비"
+        self.sheet = sheet          # 여러 시트를 파싱한 경우 시트 이름
+        self.unit_prices = number_array(unit_prices)
+        self.qtys = number_array(qtys)
+        self.freq1s = number_array(freq1s)
+        self.freq2s = number_array(freq2s)
+        self.amounts = number_array(amounts)
+        self.texts, self.text_codes = encode_texts((names, qty_units, freq1_units, freq2_units))
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def __eq__(self, other):
+        # 배열은 바이트로 비교 (NaN 끼리도 같다고 봄)
+        if not isinstance(other, Category):
+            return NotImplemented
+        return (
+            self.label == other.label
+            and self.sheet == other.sheet
+            and self.texts == other.texts
+            and self.text_codes == other.text_codes
+            and all(
+                getattr(self, field).typecode == getattr(other, field).typecode
+                and getattr(self, field).tobytes() == getattr(other, field).tobytes()
+                for field in NUMBER_FIELDS
+            )
+        )
+
+    def text_column(self, field):
+        size = len(self.amounts)
+        start = TEXT_FIELDS.index(field) * size
+        texts = self.texts
+        return [texts[code] for code in self.text_codes[start:start + size]]
+
+    @property
+    def names(self):
+        return self.text_column("names")
+
+    @property
+    def qty_units(self):
+        return self.text_column("qty_units")
+
+    @property
+    def freq1_units(self):
+        return self.text_column("freq1_units")
+
+    @property
+    def freq2_units(self):
+        return self.text_column("freq2_units")
+
+    @property
+    def total(self):
+        return sum(self.amounts)
+
+    def total_value(self):
+        """
+        엑셀에 쓸 합계입니다. 보고서 텍스트와 같이 정수로 자르고, 0 이면 None(빈 칸)입니다.
+        """
+        total = self.total
+        return int(total) if total != 0 else None
+
+    def total_text(self):
+        total = self.total_value()
+        return add_commas(total) if total is not None else ""
+
+    def to_record(self):
+        """
+        캐시에 JSON 으로 저장할 dict 를 만듭니다.
+        """
+        record = {"구분": self.label, "시트": self.sheet}
+        for field in ITEM_FIELDS:
+            record[field] = list(getattr(self, field))
+        return record
+
+    @classmethod
+    def from_record(cls, record):
+        return cls(record["구분"], *(record[field] for field in ITEM_FIELDS), sheet=record["시트"])
+
+def iter_categories(rows):
+    """
+    (B, D~L) 값 튜플을 한 행씩 받아, 중분류가 끝날 때마다 결과를 하나씩 내보냅니다.
+    현재 중분류의 항목만 들고 있으므로 시트 크기와 상관없이 메모리가 일정합니다.
+    """
+    cat_counter = 0
+    current = None      # (구분, 항목 열 목록)
+    last_main_item = None
+
+    for raw_cat, item_name, unit_price, qty, qty_unit, freq1, freq1_unit, freq2, freq2_unit, amount in rows:
+        raw_cat = str(raw_cat).strip() if pd.notna(raw_cat) else ""
+
+        if re.match(CATEGORY_PATTERN, raw_cat):  # 중분류인지 확인
+            if current is not None:
+                yield Category(current[0], *current[1])
+            cat_counter += 1
+            middle_name = re.sub(CATEGORY_PATTERN, "", raw_cat).strip()
+            current = (f"{cat_counter}. {middle_name}", [[] for _ in ITEM_FIELDS])
+            continue
+
+        # 현재 카테고리가 없는 경우 처리하지 않음
+        if current is None:
+            continue
+
+        # 항목 세부정보 가져오기
+        item_name = str(item_name).strip()
+
+        if item_name.startswith("-"):
+            # 이전 항목명 상속
+            if last_main_item is not None:
+                item_name = last_main_item
+
+        else:
+            # 새로운 주요 항목으로 설정
+            last_main_item = item_name
+
+        # 금액이 있는 항목만 처리 (문자열은 표시할 때 render_lines 로 만듦)
+        if pd.notna(amount) and amount != 0:
+            values = (item_name, unit_price, qty, qty_unit, freq1, freq1_unit, freq2, freq2_unit, amount)
+            for column, value in zip(current[1], values):
+                column.append(value)
+
+    if current is not None:
+        yield Category(current[0], *current[1])
+
+def parse_columns(needed):
+    """
+    열 단위 연산으로 중분류와 항목을 파싱합니다.
+    parse_rows 와 동일한 구분/내용/금액 결과를 반환합니다.
+    """
+    # 중분류 행 찾기 → 누적 개수로 각 행의 중분류 번호 부여 (0 은 첫 중분류 이전)
+    raw_cat = needed["raw_cat"]
+    raw_str = raw_cat.where(raw_cat.notna(), "").map(str).astype(object).str.strip()
+    is_cat = raw_str.str.match(CATEGORY_PATTERN)
+    cat_no = is_cat.cumsum()
+
+    cat_rows = raw_str[is_cat]
+    labels = [
+        f"{no}. {name}"
+        for no, name in enumerate(cat_rows.str.replace(CATEGORY_PATTERN, "", regex=True).str.strip(), start=1)
+    ]
+
+    # 첫 중분류 이후의 항목 행만 사용
+    item_mask = ~is_cat & (cat_no > 0)
+    items = needed[item_mask]
+    item_cat = cat_no[item_mask]
+
+    # "-" 로 시작하는 항목명은 직전 주요 항목명을 상속 (중분류가 바뀌어도 유지)
+    names = items["항목명"].map(str).astype(object).str.strip()
+    is_dash = names.str.startswith("-")
+    inherited = names.where(~is_dash).ffill()
+    names = names.where(~is_dash | inherited.isna(), inherited)
+
+    # 금액이 있는 항목만 처리
+    amount = items["금액"]
+    keep = amount.notna() & (amount != 0)
+    items = items[keep]
+    names = names[keep]
+    item_cat = item_cat[keep].to_numpy()
+
+    # 항목은 시트 순서 그대로이므로 중분류 번호가 오름차순 → 중분류별 항목 범위를 한 번에 구함
+    numbers = np.arange(1, len(labels) + 1)
+    starts = np.searchsorted(item_cat, numbers, side="left").tolist()
+    ends = np.searchsorted(item_cat, numbers, side="right").tolist()
+
+    # 최종 데이터 변환 (열마다 한 번만 파이썬 값으로 바꾼 뒤 범위별로 잘라 담음)
+    columns = [names.tolist()] + [items[col].tolist() for col in NEEDED_NAMES[2:]]
+    return [
+        Category(label, *(column[start:end] for column in columns))
+        for label, start, end in zip(labels, starts, ends)
+    ]
+
+def split_sheets(parsed_data):
+    """
+    파싱 결과를 시트별 (시트 이름, 중분류 목록) 으로 나눕니다.
+    시트 정보가 없는 결과(첫 시트만 파싱)는 (None, 전체) 하나가 됩니다.
+    """
+    groups = []
+    for category in parsed_data:
+        if not groups or groups[-1][0] != category.sheet:
+            groups.append((category.sheet, []))
+        groups[-1][1].append(category)
+    return groups
+
+def report_columns(parsed_data):
+    """
+    보고서 열 목록입니다. 여러 시트를 파싱한 결과는 맨 앞에 "시트" 열을 둡니다.
+    """
+    if any(category.sheet is not None for category in parsed_data):
+        return ["시트"] + REPORT_COLUMNS
+    return REPORT_COLUMNS
+
+def render_lines(parsed_data):
+    """
+    중분류마다 항목 문자열("- 항목 : 단가×갯수...=금액") 목록을 만듭니다.
+    모든 중분류의 항목 열을 이어 make_expressions 로 한 번에 만든 뒤 중분류별로 나눕니다.
+    """
+    columns = [[] for _ in ITEM_FIELDS]
+    for category in parsed_data:
+        for column, field in zip(columns, ITEM_FIELDS):
+            column.extend(getattr(category, field))
+    if not columns[-1]:
+        return [[] for _ in parsed_data]
+
+    series = [
+        pd.Series(column) if field in NUMBER_FIELDS else pd.Series(column, dtype=object)
+        for column, field in zip(columns, ITEM_FIELDS)
+    ]
+    exprs = make_expressions(*series)
+
+    lines = []
+    start = 0
+    for category in parsed_data:
+        lines.append(exprs[start:start + len(category)])
+        start += len(category)
+    return lines
+
+def report_values(parsed_data):
+    """
+    엑셀에 쓸 보고서 행 값 목록입니다. (report_columns 순서, 금액은 숫자)
+    """
+    with_sheet = "시트" in report_columns(parsed_data)
+    rows = []
+    for category, lines in zip(parsed_data, render_lines(parsed_data)):
+        row = [category.label, "\n".join(lines), category.total_value()]
+        rows.append([category.sheet] + row if with_sheet else row)
+    return rows
+
+def build_final_report(parsed_list, item_lines=None):
+    """
+    최종 보고서 텍스트를 생성합니다. (item_lines 는 이미 만든 render_lines 결과)
+    큰 보고서는 iter_report_lines 로 한 줄씩 받아 쓰는 편이 메모리를 덜 씁니다.
+    """
+    return "\n".join(iter_report_lines(parsed_list, item_lines))
+
+# 텍스트 보고서 형식: 확장자 → 형식
+REPORT_FORMATS = {".txt": "txt", ".md": "md", ".markdown": "md"}
+REPORT_FILETYPES = [("Text files", "*.txt"), ("Markdown files", "*.md")]
+
+def report_format(file_path):
+    """
+    확장자가 .txt/.md 이면 텍스트 보고서 형식을, 아니면(엑셀) None 을 반환합니다.
+    """
+    return REPORT_FORMATS.get(os.path.splitext(file_path)[1].lower())
+
+def category_text_lines(category, lines, header=False):
+    """
+    보고서 텍스트에서 중분류 하나가 차지하는 줄 목록입니다. ("구분 | 내용 | 금액", 내용은 여러 줄)
+    """
+    text_lines = [f"[{category.sheet}]", ""] if header else []
+    body = [f"{category.label} | " + (lines[0] if lines else "")] + list(lines[1:])
+    body[-1] += f" | {category.total_text()}"
+    return text_lines + body
+
+def markdown_cell(text):
+    return "" if text is None else str(text).replace("|", "\\|")
+
+def iter_report_lines(parsed_data, item_lines=None, fmt="txt"):
+    """
+    최종 보고서를 한 줄씩 내보냅니다. (줄바꿈 문자 없이)
+    fmt="txt" 는 build_final_report 와 같은 "구분 | 내용 | 금액" 텍스트, fmt="md" 는 Markdown 표입니다.
+    """
+    if not parsed_data:
+        yield "데이터가 없습니다."
+        return
+    if item_lines is None:
+        item_lines = render_lines(parsed_data)
+
+    if fmt == "md":
+        # 중분류 하나가 표 한 줄 (항목은 <br> 로 구분)
+        columns = report_columns(parsed_data)
+        yield "| " + " | ".join(columns) + " |"
+        yield "|" + "|".join("---:" if column == "금액" else "---" for column in columns) + "|"
+        with_sheet = len(columns) > len(REPORT_COLUMNS)
+        for category, lines in zip(parsed_data, item_lines):
+            cells = [category.sheet] if with_sheet else []
+            cells += [category.label, "\n".join(lines), category.total_text()]
+            yield "| " + " | ".join(markdown_cell(cell).replace("\n", "<br>") for cell in cells) + " |"
+        return
+
+    for idx, (category, lines, header) in enumerate(zip(parsed_data, item_lines, sheet_headers(parsed_data))):
+        if idx:
+            yield ""
+        yield from category_text_lines(category, lines, header)
+
+def iter_text_chunks(lines, size):
+    """
+    줄을 size 개씩 묶어 줄바꿈으로 이은 문자열로 내보냅니다. (Text 위젯/클립보드에 나눠 넣을 때)
+    """
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield "\n".join(chunk)
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk)
+
+# ------------------ 성능 기록 ------------------ #
+# 단계 이름과 화면에 보일 이름
+STAGE_LABELS = {
+    "cache": "캐시 조회",
+    "prefetch": "미리 읽기",
+    "read": "읽기",
+    "coerce": "숫자 변환",
+    "group": "분류",
+    "stream": "스트림 파싱",
+    "render": "보고서",
+    "tree": "트리",
+    "save": "저장",
+    "store": "저장소 기록",
+    "window": "창 표시",
+    "modules": "모듈 불러오기",
+}
+TIMING_LOG_BYTES = 1024 * 1024
+TIMING_LOG_BACKUPS = 3
+
+def app_data_dir():
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "KISDI_Budget")
+
+def peak_memory_mb():
+    """
+    프로세스의 최대 메모리 사용량(Windows 는 피크 워킹셋, 그 외는 최대 RSS)을 MB 로 반환합니다.
+    단계가 순서대로 실행되므로 단계 사이에 이 값이 늘었다면 그 단계가 최대치를 만든 것입니다.
+    """
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            kernel32 = ctypes.windll.kernel32
+            kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+            ctypes.windll.psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb)
+            return counters.PeakWorkingSetSize / (1024 * 1024)
+
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS 는 바이트, 리눅스는 KB 단위
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except Exception:
+        return None
+
+class StageTimer:
+    """
+    파일 하나를 처리하는 동안 단계별 소요 시간, 행 수, 최대 메모리를 기록합니다.
+        with timer.stage("read") as record:
+            df = pd.read_excel(...)
+            record["rows"] = len(df)
+    """
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        record = {"seconds": 0.0, "rows": None, "peak_mb": None}
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            record["peak_mb"] = peak_memory_mb()
+            self.stages[name] = record
+
+    def summary(self):
+        """
+        상태 표시줄용 한 줄 요약을 만듭니다.
+        """
+        parts = []
+        for name, record in self.stages.items():
+            text = f"{STAGE_LABELS.get(name, name)} {record['seconds']:.3f}s"
+            if record["rows"] is not None:
+                text += f"({record['rows']:,}행)"
+            if record.get("error"):
+                text += " 실패"
+            parts.append(text)
+        peaks = [record["peak_mb"] for record in self.stages.values() if record["peak_mb"] is not None]
+        text = f"{os.path.basename(self.file_path)} | " + " · ".join(parts)
+        if peaks:
+            text += f" | 최대 메모리 {max(peaks):,.0f}MB"
+        return text
+
+    def to_record(self):
+        return {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "file": self.file_path,
+            "total_seconds": sum(record["seconds"] for record in self.stages.values()),
+            "stages": self.stages,
+        }
+
+def measure(timer, name):
+    """
+    timer 가 있으면 단계를 기록하고, 없으면 아무것도 하지 않는 with 문을 돌려줍니다.
+    """
+    if timer is None:
+        return contextlib.nullcontext({})
+    return timer.stage(name)
+
+def timing_logger():
+    """
+    단계별 기록을 JSON 한 줄씩 남기는 로거입니다. (timing.jsonl, 크기가 넘으면 순환)
+    """
+    logger = logging.getLogger("KISDI_Budget.timing")
+    if not logger.handlers:
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        try:
+            os.makedirs(app_data_dir(), exist_ok=True)
+            handler = logging_handlers.RotatingFileHandler(
+                os.path.join(app_data_dir(), "timing.jsonl"),
+                maxBytes=TIMING_LOG_BYTES, backupCount=TIMING_LOG_BACKUPS, encoding="utf-8")
+        except OSError:
+            handler = logging.NullHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    return logger
+
+def log_timing(timer):
+    timing_logger().info(json.dumps(timer.to_record(), ensure_ascii=False))
+
+def profiled(work, profile):
+    """
+    work 를 cProfile 로 감싸 호출합니다. 여러 번 호출해도 같은 profile 에 누적됩니다.
+    """
+    def run(*args, **kwargs):
+        return profile.runcall(work, *args, **kwargs)
+    return run
+
+# ------------------ 파싱 캐시 ------------------ #
+# 파싱 결과 형식이 바뀌면 올려서 이전 캐시를 무시합니다.
+CACHE_VERSION = 2   # 2: Category 레코드(항목 열) 형식
+SHEETS_VARIANT = "-sheets"   # 모든 시트를 파싱한 결과의 캐시 키 접미사
+CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+def default_cache_dir():
+    return os.path.join(app_data_dir(), "cache")
+
+class ParseCache:
+    """
+    파싱 결과를 디스크에 저장하는 캐시입니다.
+    - 결과는 파일 내용의 해시(sha256)로 저장하므로 이름만 다른 같은 파일은 한 항목을 공유합니다.
+    - 경로/크기/수정시각이 그대로인 파일은 index.json 으로 해시를 찾아 다시 읽지 않습니다.
+    - 전체 크기가 max_bytes 를 넘으면 가장 오래 사용하지 않은 항목부터 지웁니다. (LRU)
+    - 여러 파싱 스레드에서 함께 써도 되도록 index 를 잠금으로 보호합니다.
+    """
+    def __init__(self, directory=None, max_bytes=CACHE_MAX_BYTES):
+        self.directory = os.path.join(directory or default_cache_dir(), f"v{CACHE_VERSION}")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self.index_path = os.path.join(self.directory, "index.json")
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def known_key(self, file_path, variant="", stat=None):
+        """
+        크기와 수정시각이 index 에 적힌 것과 같으면 파일을 읽지 않고 캐시 키를 반환합니다. 아니면 None 입니다.
+        stat 을 주면 지금 파일 대신 그 stat 과 비교합니다. (미리 읽은 내용의 stat)
+        """
+        path = os.path.abspath(file_path)
+        if stat is None:
+            stat = os.stat(path)
+        known = self.index.get(path)
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2] + variant
+        return None
+
+    def key(self, file_path, variant="", data=None, stat=None):
+        """
+        파일의 캐시 키(내용 해시)를 반환합니다. 크기와 수정시각이 같으면 해시를 다시 계산하지 않습니다.
+        같은 파일을 다른 방식으로 파싱한 결과는 variant 를 붙여 따로 저장합니다. (예: 모든 시트)
+        data 에 미리 읽어 둔 내용을 주면 파일을 다시 읽지 않고 그 내용으로 해시를 계산합니다.
+        이때 stat 에는 read_file_bytes 가 내용과 함께 잰 stat 을 줍니다. (그 사이 저장된 파일과 섞이지 않도록)
+        """
+        path = os.path.abspath(file_path)
+        if data is None or stat is None:
+            stat = os.stat(path)
+        known = self.known_key(path, variant, stat)
+        if known is not None:
+            return known
+
+        if data is not None:
+            digest = hashlib.sha256(data).hexdigest()
+        else:
+            hasher = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    hasher.update(chunk)
+            digest = hasher.hexdigest()
+        with self.lock:
+            self.index[path] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest + variant
+
+    def cached(self, file_path, variant=""):
+        """
+        파일을 읽지 않고 알 수 있는 범위에서 캐시된 결과가 있는지 확인합니다. (미리 읽기를 건너뛸지 판단)
+        """
+        try:
+            key = self.known_key(file_path, variant)
+        except OSError:
+            return False
+        return key is not None and os.path.exists(self.entry_path(key))
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key):
+        """
+        캐시된 파싱 결과를 반환합니다. 없으면 None 을 반환합니다.
+        """
+        entry = self.entry_path(key)
+        try:
+            with open(entry, encoding="utf-8") as f:
+                parsed_data = [Category.from_record(record) for record in json.load(f)]
+        except (OSError, ValueError, KeyError, TypeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        # 사용 시각 갱신 (LRU 순서)
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return parsed_data
+
+    def store(self, key, parsed_data):
+        """
+        파싱 결과를 저장하고, 크기 제한을 넘으면 오래된 항목을 지웁니다.
+        캐시는 다시 읽지 않기 위한 것이므로 저장하지 못해도 예외 대신 False 를 반환합니다.
+        """
+        entry = self.entry_path(key)
+        try:
+            write_json_atomic(entry, [category.to_record() for category in parsed_data])
+            with self.lock:
+                self.evict()
+                write_json_atomic(self.index_path, self.index)
+        except (OSError, TypeError, ValueError):
+            return False
+        return True
+
+    def evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json") or name == "index.json":
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+
+        removed = set()
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            total -= size
+            removed.add(name[:-len(".json")])
+
+        if removed:
+            self.index = {path: known for path, known in self.index.items() if known[2] not in removed}
+
+    def parse(self, file_path, parse_func, *args, timer=None, variant="", data=None, stat=None):
+        """
+        캐시에 있으면 엑셀을 읽지 않고 결과를 돌려주고, 없으면 parse_func 로 파싱한 뒤 저장합니다.
+        timer 를 주면 해시 계산과 캐시 읽기를 "cache" 단계로 기록합니다.
+        data/stat 은 read_file_bytes 로 미리 읽어 둔 파일 내용과 그때의 stat 으로, 해시를 계산할 때 파일을 다시 읽지 않게 합니다.
+        """
+        with measure(timer, "cache") as record:
+            try:
+                key = self.key(file_path, variant, data, stat)
+            except OSError:
+                key = None
+            parsed_data = self.load(key) if key is not None else None
+            if parsed_data is not None:
+                record["rows"] = count_items(parsed_data)
+        if key is None:
+            return parse_func(file_path, *args)
+        if parsed_data is not None:
+            return parsed_data
+
+        parsed_data = parse_func(file_path, *args)
+        if parsed_data:
+            self.store(key, parsed_data)
+        return parsed_data
+
+    def counts(self):
+        return self.hits, self.misses
+
+    def stats(self, since=(0, 0)):
+        """
+        적중/미적중 횟수 요약입니다. since 에 이전 counts() 를 주면 그 뒤의 횟수만 셉니다.
+        """
+        return f"캐시 적중 {self.hits - since[0]}회 / 미적중 {self.misses - since[1]}회"
+
+def write_json_atomic(path, data):
+    """
+    임시 파일에 쓴 뒤 이름을 바꿔, 중간에 종료되어도 깨진 파일이 남지 않게 합니다.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # 쓰기나 바꿔치기에 실패하면 임시 파일을 남기지 않음
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+# ------------------ 항목 저장소 ------------------ #
+# 파싱한 항목을 한 행씩 SQLite 파일에 쌓아 두고, 원본 엑셀을 다시 열지 않고 여러 파일의 합계를 구합니다.
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    digest TEXT,
+    stored_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    file_id INTEGER NOT NULL,
+    sheet TEXT,
+    category_no INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    name TEXT,
+    unit_price NUMERIC,
+    qty NUMERIC,
+    qty_unit TEXT,
+    freq1 NUMERIC,
+    freq1_unit TEXT,
+    freq2 NUMERIC,
+    freq2_unit TEXT,
+    amount NUMERIC NOT NULL
+);
+-- 파일 번호와 금액을 인덱스에 함께 넣어 중분류/항목별 합계를 표를 읽지 않고 인덱스만으로 구함
+CREATE INDEX IF NOT EXISTS items_file ON items (file_id, category, amount);
+CREATE INDEX IF NOT EXISTS items_category ON items (category, name, file_id, amount);
+CREATE INDEX IF NOT EXISTS items_name ON items (name, file_id, amount);
+"""
+# 합계 기준: (머리글, 표시할 열, 묶는 열) - 파일은 번호로 묶어 이름이 같은 다른 폴더의 파일을 구분
+STORE_GROUPS = {
+    "category": ("중분류", "items.category", "items.category"),
+    "name": ("항목", "items.name", "items.name"),
+    "file": ("파일", "files.name", "items.file_id"),
+    "sheet": ("시트", "items.sheet", "items.sheet"),
+}
+# export_rollup 이 만드는 시트: (시트 이름, 합계 기준)
+ROLLUP_SHEETS = [
+    ("중분류별", ("category",)),
+    ("항목별", ("category", "name")),
+    ("파일별", ("file", "category")),
+]
+
+# 문자열로 기록하는 항목 열 (items 표의 TEXT 열)
+STORE_TEXT_FIELDS = ("qty_units", "freq1_units", "freq2_units")
+
+def default_store_path():
+    return os.path.join(app_data_dir(), "items.sqlite")
+
+def store_rows(file_id, parsed_data):
+    """
+    파싱 결과를 items 표의 행으로 펼칩니다. 중분류 번호("1. ")는 따로 두어 파일끼리 이름으로 합칠 수 있게 합니다.
+    단위는 TEXT 열이므로 숫자/날짜 단위도 보고서에 보이는 문자열로 기록합니다.
+    """
+    for category in parsed_data:
+        number, _, name = category.label.partition(". ")
+        columns = [
+            [None if value is None else str(value) for value in getattr(category, field)]
+            if field in STORE_TEXT_FIELDS else getattr(category, field)
+            for field in ITEM_FIELDS
+        ]
+        for values in zip(*columns):
+            yield (file_id, category.sheet, int(number), name) + values
+
+class ItemStore:
+    """
+    파싱한 항목을 파일별로 기록하는 SQLite 저장소입니다.
+    - 파일 하나를 한 트랜잭션으로 기록하며, 같은 파일을 다시 기록하면 이전 행을 바꿔 씁니다.
+    - 내용 해시(digest)가 기록된 것과 같으면 건너뜁니다.
+    - 작업 스레드와 GUI 스레드에서 함께 쓰므로 연결 하나를 잠금으로 보호합니다.
+    """
+    def __init__(self, path=None):
+        self.path = path or default_store_path()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL: 기록 중에도 조회할 수 있고, 파일마다 커밋해도 느려지지 않음
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.executescript(STORE_SCHEMA)
+
+    def add(self, file_path, parsed_data, digest=None):
+        """
+        파일 하나의 파싱 결과를 기록합니다. 같은 내용이 이미 기록되어 있으면 False 를 반환합니다.
+        """
+        path = os.path.abspath(file_path)
+        with self.lock, self.db:
+            known = self.db.execute("SELECT id, digest FROM files WHERE path = ?", (path,)).fetchone()
+            if known is not None and digest is not None and known[1] == digest:
+                return False
+            if known is None:
+                file_id = self.db.execute(
+                    "INSERT INTO files (path, name, digest, stored_at) VALUES (?, ?, ?, ?)",
+                    (path, os.path.basename(path), digest, time.time())).lastrowid
+            else:
+                file_id = known[0]
+                self.db.execute("DELETE FROM items WHERE file_id = ?", (file_id,))
+                self.db.execute("UPDATE files SET digest = ?, stored_at = ? WHERE id = ?",
+                                (digest, time.time(), file_id))
+            self.db.executemany("INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                store_rows(file_id, parsed_data))
+        return True
+
+    def remove(self, file_path):
+        path = os.path.abspath(file_path)
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM items WHERE file_id IN (SELECT id FROM files WHERE path = ?)", (path,))
+            self.db.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def totals(self, by=("category",), category=None, name=None, file=None, limit=None):
+        """
+        by 기준별 (기준 값..., 항목 수, 파일 수, 금액 합계) 목록을 금액이 큰 순서로 반환합니다.
+        category/name/file 을 주면 중분류/항목/파일 이름에 그 글자가 들어간 항목만 합칩니다.
+        """
+        columns = ", ".join(STORE_GROUPS[key][1] for key in by)
+        groups = ", ".join(STORE_GROUPS[key][2] for key in by)
+        sql = f"SELECT {columns}, COUNT(*), COUNT(DISTINCT items.file_id), SUM(items.amount) FROM items"
+        if "file" in by or file:
+            # 파일 이름이 필요할 때만 연결 (그 외에는 인덱스만 읽음)
+            sql += " JOIN files ON files.id = items.file_id"
+        where = []
+        params = []
+        for column, pattern in (("items.category", category), ("items.name", name), ("files.name", file)):
+            if pattern:
+                where.append(f"{column} LIKE ?")
+                params.append(f"%{pattern}%")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" GROUP BY {groups} ORDER BY SUM(items.amount) DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self.lock:
+            return self.db.execute(sql, params).fetchall()
+
+    @staticmethod
+    def columns(by=("category",)):
+        return [STORE_GROUPS[key][0] for key in by] + ["항목 수", "파일 수", "금액"]
+
+    def export_rollup(self, output_file, **filters):
+        """
+        중분류별 / 항목별 / 파일별 합계를 시트 하나씩 엑셀 파일로 저장합니다.
+        """
+        with pd.ExcelWriter(output_file) as writer:
+            for sheet_name, by in ROLLUP_SHEETS:
+                df = pd.DataFrame(self.totals(by, **filters), columns=self.columns(by))
+                df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+    def counts(self):
+        """
+        (기록된 파일 수, 항목 수)를 반환합니다.
+        """
+        with self.lock:
+            files = self.db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            items = self.db.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        return files, items
+
+    def stats(self):
+        files, items = self.counts()
+        return f"항목 저장소: 파일 {files:,}개, 항목 {items:,}개 ({self.path})"
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+# ------------------ 엑셀 저장 ------------------ #
+REPORT_SHEET = "예산보고서" # 시트 이름은 원하시는대로 지정해주시면 될 것 같습니다.
+CONSOLIDATED_SHEET = "통합데이터"
+
+REPORT_COLUMNS = ["구분", "내용", "금액"]
+AMOUNT_FORMAT = "#,##0"     # 금액 칸 표시 형식 (엑셀 기본 서식 3번)
+
+# .xlsx 내부 XML 의 네임스페이스와 형식
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+REL_WORKSHEET = NS_REL + "/worksheet"
+REL_OFFICE_DOCUMENT = NS_REL + "/officeDocument"
+CT_WORKSHEET = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+REL_STYLES = NS_REL + "/styles"
+
+# XML 에 넣을 수 없는 제어 문자 (openpyxl 과 동일)
+ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+def append_report_sheet(file_path, parsed_data, sheet_name=REPORT_SHEET):
+    """
+    기존 엑셀 파일에 '새 시트'를 만들어 파싱 결과를 추가하고, 실제로 붙은 시트 이름을 반환합니다.
+    같은 이름의 시트가 있으면 openpyxl 규칙대로 새 이름(예산보고서1 ...)이 붙습니다.
+    .xlsx/.xlsm 은 inject_report_sheet 로 다른 시트를 다시 쓰지 않고 추가합니다.
+    """
+    if can_stream(file_path):
+        try:
+            return inject_report_sheet(file_path, parsed_data, sheet_name)
+        except ValueError:
+            # 예상과 다른 통합문서 구조이면 openpyxl 로 다시 저장
+            pass
+
+    with pd.ExcelWriter(file_path,
+                        engine="openpyxl",
+                        mode="a",
+                        if_sheet_exists="new") as writer:
+        return write_report_frame(writer, parsed_data, sheet_name)
+
+def write_report_frame(writer, parsed_data, sheet_name=REPORT_SHEET):
+    """
+    pandas ExcelWriter(openpyxl) 에 보고서 시트를 쓰고, 실제로 붙은 시트 이름을 반환합니다.
+    to_excel 은 서식 없이 쓰므로 금액 칸에 AMOUNT_FORMAT 을 따로 지정합니다.
+    """
+    columns = report_columns(parsed_data)
+    df = pd.DataFrame(report_values(parsed_data), columns=columns)
+    df.to_excel(writer, sheet_name=sheet_name, index=False)
+    ws = writer.book.worksheets[-1]
+    amount_col = columns.index("금액") + 1
+    for (cell,) in ws.iter_rows(min_row=2, min_col=amount_col, max_col=amount_col):
+        cell.number_format = AMOUNT_FORMAT
+    return ws.title
+
+def save_report_excel(file_path, parsed_data, sheet_name="Sheet1"):
+    """
+    파싱 결과를 보고서 시트 하나짜리 새 엑셀 파일로 저장합니다. (금액 칸은 #,##0 서식)
+    시트 이름 기본값은 예전 df.to_excel 과 같은 "Sheet1" 입니다.
+    """
+    with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
+        return write_report_frame(writer, parsed_data, sheet_name)
+
+def new_sheet_name(names, value):
+    """
+    openpyxl 과 같은 규칙으로 겹치지 않는 시트 이름을 만듭니다. (대소문자 무시, 가장 큰 번호 + 1)
+    """
+    if not any(name.lower() == value.lower() for name in names):
+        return value
+    pattern = re.compile(f"(?P<title>{re.escape(value)})(?P<count>\\d*),?", re.I)
+    counts = [int(count) for _, count in pattern.findall(",".join(names)) if count.isdigit()]
+    return f"{value}{max(counts, default=0) + 1}"
+
+def xml_attr(text):
+    return saxutils.escape(text, {'"': "&quot;"})
+
+def xml_attr_value(tag, name):
+    match = re.search(rf'\b{name}="([^"]*)"', tag)
+    if match is None:
+        raise ValueError(f"{name} 속성을 찾을 수 없습니다: {tag}")
+    return saxutils.unescape(match.group(1), {"&quot;": '"', "&apos;": "'"})
+
+def rels_path(part):
+    folder, name = posixpath.split(part)
+    return posixpath.join(folder, "_rels", name + ".rels")
+
+def add_number_style(styles_xml):
+    """
+    styles.xml 의 cellXfs 에 "#,##0" 서식을 하나 추가하고 (styles.xml, 서식 번호)를 반환합니다.
+    글꼴/채우기/테두리가 기본인 "#,##0" 서식이 이미 있으면 (이전에 추가한 것 포함) 추가하지 않고 그 번호를 씁니다.
+    """
+    match = re.search(r"<(\w+:)?cellXfs\b[^>]*>(.*?)</(?:\w+:)?cellXfs>", styles_xml, re.S)
+    if match is None:
+        raise ValueError("styles.xml 에 셀 서식 목록이 없습니다.")
+    prefix = match.group(1) or ""
+    xfs = re.findall(r"<(?:\w+:)?xf\b([^>]*?)(/?)>", match.group(2))
+    for style, (attrs, closed) in enumerate(xfs):
+        values = dict(re.findall(r'\b(\w+)="([^"]*)"', attrs))
+        if (closed and values.get("numFmtId") == "3"
+                and all(values.get(name, "0") == "0" for name in ("fontId", "fillId", "borderId", "xfId"))):
+            return styles_xml, style
+    style = len(xfs)
+    xf = f'<{prefix}xf numFmtId="3" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    opening = re.sub(r'\bcount="\d+"', f'count="{style + 1}"', styles_xml[match.start():match.start(2)])
+    closing = styles_xml[match.end(2):match.end()]
+    styles_xml = styles_xml[:match.start()] + opening + match.group(2) + xf + closing + styles_xml[match.end():]
+    return styles_xml, style
+
+def iter_sheet_xml(rows, number_style=None):
+    """
+    값 목록(행)으로 워크시트 XML 을 조각조각 만들어 냅니다. 문자열은 인라인 문자열로 씁니다.
+    number_style 을 주면 숫자 칸에 그 셀 서식 번호를 붙입니다.
+    """
+    style_attr = f' s="{number_style}"' if number_style is not None else ""
+    get_column_letter = openpyxl_utils.get_column_letter
+    rows = list(rows)
+    width = max((len(row) for row in rows), default=1)
+    yield '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    yield f'<worksheet xmlns="{NS_MAIN}">'
+    yield f'<dimension ref="A1:{get_column_letter(width)}{max(len(rows), 1)}"/><sheetData>'
+    for r, row in enumerate(rows, start=1):
+        cells = []
+        for c, value in enumerate(row, start=1):
+            ref = f"{get_column_letter(c)}{r}"
+            if value is None or value == "":
+                continue
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                cells.append(f'<c r="{ref}"{style_attr}><v>{value}</v></c>')
+            else:
+                text = saxutils.escape(ILLEGAL_XML_CHARS.sub("", str(value)))
+                cells.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+        yield f'<row r="{r}">{"".join(cells)}</row>'
+    yield '</sheetData></worksheet>'
+
+def find_workbook_part(src, names):
+    """
+    .xlsx 압축 안의 통합문서 파트 위치를 찾습니다. (_rels/.rels 의 officeDocument)
+    """
+    root_rels = src.read("_rels/.rels").decode("utf-8")
+    workbook_part = None
+    for tag in re.findall(r"<(?:\w+:)?Relationship\b[^>]*>", root_rels):
+        if xml_attr_value(tag, "Type") == REL_OFFICE_DOCUMENT:
+            workbook_part = xml_attr_value(tag, "Target").lstrip("/")
+    if workbook_part is None or workbook_part not in names:
+        raise ValueError("통합문서 파트를 찾을 수 없습니다.")
+    return workbook_part
+
+def workbook_sheet_names(file_path):
+    """
+    통합문서 XML 만 읽어 시트 이름 목록을 반환합니다. (시트 내용은 읽지 않음)
+    """
+    with zipfile.ZipFile(file_path) as src:
+        workbook_xml = src.read(find_workbook_part(src, set(src.namelist()))).decode("utf-8")
+    return [xml_attr_value(tag, "name") for tag in re.findall(r"<(?:\w+:)?sheet\b[^>]*>", workbook_xml)]
+
+def inject_report_sheet(file_path, parsed_data, sheet_name=REPORT_SHEET):
+    """
+    .xlsx 압축 파일에 새 시트 XML 을 직접 넣고 통합문서/관계/콘텐츠 형식 파트만 고칩니다.
+    다른 파트는 내용 그대로 복사하므로 openpyxl 이 다루지 못하는 서식도 유지됩니다.
+    임시 파일에 쓴 뒤 이름을 바꾸므로 중간에 실패해도 원본은 그대로입니다.
+    """
+    rows = [report_columns(parsed_data)] + report_values(parsed_data)
+
+    with zipfile.ZipFile(file_path) as src:
+        names = set(src.namelist())
+        workbook_part = find_workbook_part(src, names)
+        workbook_rels_part = rels_path(workbook_part)
+        workbook_dir = posixpath.dirname(workbook_part)
+
+        workbook_xml = src.read(workbook_part).decode("utf-8")
+        workbook_rels = src.read(workbook_rels_part).decode("utf-8")
+        content_types = src.read("[Content_Types].xml").decode("utf-8")
+
+        # 금액 칸 서식 (스타일 파트가 있으면 "#,##0" 서식을 추가)
+        styles_part = None
+        for tag in re.findall(r"<(?:\w+:)?Relationship\b[^>]*>", workbook_rels):
+            if xml_attr_value(tag, "Type") == REL_STYLES:
+                styles_part = posixpath.normpath(posixpath.join(workbook_dir, xml_attr_value(tag, "Target")))
+        number_style = None
+        if styles_part in names:
+            styles_xml, number_style = add_number_style(src.read(styles_part).decode("utf-8"))
+
+        # 시트 이름/번호, 관계 ID, 파트 이름이 겹치지 않게 정함
+        sheet_tags = re.findall(r"<(?:\w+:)?sheet\b[^>]*>", workbook_xml)
+        sheet_name = new_sheet_name([xml_attr_value(tag, "name") for tag in sheet_tags], sheet_name)
+        sheet_id = max((int(xml_attr_value(tag, "sheetId")) for tag in sheet_tags), default=0) + 1
+        rel_ids = set(re.findall(r'\bId="([^"]*)"', workbook_rels))
+        rel_no = len(rel_ids) + 1
+        while f"rId{rel_no}" in rel_ids:
+            rel_no += 1
+        rel_id = f"rId{rel_no}"
+        sheet_no = 1
+        while posixpath.join(workbook_dir, "worksheets", f"sheet{sheet_no}.xml") in names:
+            sheet_no += 1
+        sheet_part = posixpath.join(workbook_dir, "worksheets", f"sheet{sheet_no}.xml")
+
+        # 통합문서: </sheets> 앞에 새 시트 추가
+        closing = re.search(r"</(\w+:)?sheets>", workbook_xml)
+        if closing is None:
+            raise ValueError("통합문서에 시트 목록이 없습니다.")
+        prefix = closing.group(1) or ""
+        rel_prefix = re.search(rf'xmlns:(\w+)="{re.escape(NS_REL)}"', workbook_xml)
+        if rel_prefix is not None:
+            rel_attr = f'{rel_prefix.group(1)}:id="{rel_id}"'
+        else:
+            rel_attr = f'xmlns:r="{NS_REL}" r:id="{rel_id}"'
+        sheet_tag = f'<{prefix}sheet name="{xml_attr(sheet_name)}" sheetId="{sheet_id}" {rel_attr}/>'
+        workbook_xml = workbook_xml[:closing.start()] + sheet_tag + workbook_xml[closing.start():]
+
+        # 관계: 새 시트 파트 연결
+        relationship = (f'<Relationship Id="{rel_id}" Type="{REL_WORKSHEET}" '
+                        f'Target="{posixpath.relpath(sheet_part, workbook_dir or ".")}"/>')
+        workbook_rels = re.sub(r"</(\w+:)?Relationships>", lambda m: relationship + m.group(0), workbook_rels, count=1)
+
+        # 콘텐츠 형식: 새 시트 파트 등록
+        override = f'<Override PartName="/{sheet_part}" ContentType="{CT_WORKSHEET}"/>'
+        content_types = re.sub(r"</(\w+:)?Types>", lambda m: override + m.group(0), content_types, count=1)
+
+        changed = {
+            workbook_part: workbook_xml,
+            workbook_rels_part: workbook_rels,
+            "[Content_Types].xml": content_types,
+        }
+        if number_style is not None:
+            changed[styles_part] = styles_xml
+
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(os.path.abspath(file_path)))
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as dst:
+                for info in src.infolist():
+                    out_info = copy.copy(info)
+                    if info.filename in changed:
+                        dst.writestr(out_info, changed[info.filename].encode("utf-8"))
+                        continue
+                    with src.open(info) as reader, dst.open(out_info, "w") as writer:
+                        shutil.copyfileobj(reader, writer, 1024 * 1024)
+
+                sheet_info = zipfile.ZipInfo(sheet_part, date_time=time.localtime()[:6])
+                sheet_info.compress_type = zipfile.ZIP_DEFLATED
+                with dst.open(sheet_info, "w") as writer:
+                    for chunk in iter_sheet_xml(rows, number_style):
+                        writer.write(chunk.encode("utf-8"))
+            shutil.copymode(file_path, tmp_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    try:
+        os.replace(tmp_path, file_path)
+    except OSError:
+        # 엑셀이 파일을 열고 있으면 바꿔치기할 수 없음 (임시 파일은 남기지 않음)
+        os.remove(tmp_path)
+        raise
+    return sheet_name
+
+INDEX_SHEET = "파일목록"
+
+class ConsolidatedWriter:
+    """
+    통합 엑셀 파일을 openpyxl write-only 모드로 한 파일씩 이어 씁니다.
+    행은 바로 임시 파일로 내려가므로 입력 파일이 많아도 메모리가 늘지 않고, 저장은 close() 에서 한 번만 합니다.
+    with_index=True 이면 파일별 시작/끝 행을 적은 "파일목록" 시트를 추가합니다.
+    여러 시트를 파싱한 결과는 시트마다 블록을 하나씩 씁니다.
+    """
+    def __init__(self, output_file, with_index=False):
+        self.output_file = output_file
+        self.with_index = with_index
+        self.book = openpyxl.Workbook(write_only=True)
+        self.sheet = self.book.create_sheet(CONSOLIDATED_SHEET)
+        self.row = 0       # 지금까지 쓴 행 수
+        self.index = []    # (파일 이름, 시작 행, 끝 행, 중분류 수)
+
+    def append(self, file_path, parsed_data):
+        """
+        파일 이름 행과 보고서 행을 이어 씁니다. (기존 통합 시트와 같은 배치)
+        첫 파일만 열 머리글을 쓰고, 두 번째 파일부터는 데이터 뒤에 빈 행을 하나 둡니다.
+        """
+        file_name = os.path.basename(file_path)
+        for sheet, items in split_sheets(parsed_data) or [(None, [])]:
+            self.append_block(file_name, sheet, items)
+
+    def append_block(self, file_name, sheet, parsed_data):
+        # 각 파일(시트)의 이름을 각 데이터 사이에 삽입
+        start = self.row + 1
+        if sheet is None:
+            self.sheet.append(['파일 이름:', file_name])
+        else:
+            self.sheet.append(['파일 이름:', file_name, '시트:', sheet])
+            file_name = f"{file_name} [{sheet}]"
+
+        header = self.row == 0 and bool(parsed_data)
+        if header:
+            self.sheet.append(REPORT_COLUMNS)
+        for category, lines in zip(parsed_data, render_lines(parsed_data)):
+            # 금액은 합계할 수 있도록 숫자 칸으로 씀
+            amount = openpyxl.cell.WriteOnlyCell(self.sheet, value=category.total_value())
+            amount.number_format = AMOUNT_FORMAT
+            self.sheet.append([category.label, "\n".join(lines), amount])
+        if not header:
+            self.sheet.append([])
+
+        # 파일 이름을 위한 1행과 데이터 행(+머리글 또는 빈 행)을 포함한 크기만큼 증가
+        self.row += len(parsed_data) + 2
+        end = start + len(parsed_data) + (1 if header else 0)
+        self.index.append((file_name, start, end, len(parsed_data)))
+
+    def close(self):
+        if self.with_index:
+            index_sheet = self.book.create_sheet(INDEX_SHEET)
+            index_sheet.append(["파일 이름", "시작 행", "끝 행", "중분류 수"])
+            for row in self.index:
+                index_sheet.append(list(row))
+        self.book.save(self.output_file)
+
+    def discard(self):
+        """
+        저장하지 않고 버립니다. (작업 취소)
+        이미 쓴 행이 담긴 시트별 임시 파일(openpyxl.*)도 닫고 지웁니다.
+        """
+        if self.book is None:
+            return
+        for sheet in self.book.worksheets:
+            writer = getattr(sheet, "_writer", None)
+            if writer is None:
+                continue
+            with contextlib.suppress(Exception):
+                if not sheet.closed:
+                    sheet.close()
+            with contextlib.suppress(OSError):
+                os.remove(writer.out)
+        self.book = None
+
+class ReportTextWriter:
+    """
+    최종 보고서를 텍스트(.txt) 또는 Markdown(.md) 파일로 한 줄씩 이어 씁니다. (ConsolidatedWriter 와 같은 사용법)
+    파일마다 받는 즉시 임시 파일에 기록하므로 보고서 전체를 하나의 문자열로 만들지 않고,
+    close() 에서 임시 파일을 대상 파일로 바꿉니다. 임시 파일은 첫 append 에서 만들고, discard() 로 지웁니다.
+    with_names=True 이면 파일마다 파일 이름 줄을 앞에 둡니다. (여러 파일 통합)
+    """
+    def __init__(self, output_file, with_names=True, fmt=None):
+        self.output_file = output_file
+        self.with_names = with_names
+        self.fmt = fmt or report_format(output_file) or "txt"
+        self.tmp_path = f"{output_file}.{os.getpid()}.tmp"
+        self.file = None   # 임시 파일은 처음 쓸 때 엶
+        self.count = 0     # 지금까지 쓴 파일 수
+
+    def open(self):
+        if self.file is None:
+            self.file = open(self.tmp_path, "w", encoding="utf-8", newline="\n")
+        return self.file
+
+    def append(self, file_path, parsed_data):
+        file = self.open()
+        if self.count:
+            file.write("\n")
+        self.count += 1
+        if self.with_names:
+            file_name = os.path.basename(file_path)
+            file.write(f"## {file_name}\n\n" if self.fmt == "md" else f"파일 이름: {file_name}\n\n")
+        for line in iter_report_lines(parsed_data, fmt=self.fmt):
+            file.write(line + "\n")
+
+    def close(self):
+        self.open().close()
+        try:
+            os.replace(self.tmp_path, self.output_file)
+        except OSError:
+            os.remove(self.tmp_path)
+            raise
+
+    def discard(self):
+        if self.file is None:
+            return
+        self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+def open_report_writer(output_file, with_index=False):
+    """
+    출력 파일 확장자로 통합 기록기를 고릅니다. (.txt/.md 는 텍스트 보고서, 그 밖에는 엑셀)
+    """
+    if report_format(output_file):
+        return ReportTextWriter(output_file)
+    return ConsolidatedWriter(output_file, with_index)
+
+def write_consolidated(output_file, reports, with_index=False):
+    """
+    (파일 경로, 파싱 결과) 쌍을 순서대로 받아 하나의 통합 파일(엑셀 또는 .txt/.md)에 기록합니다.
+    reports 는 제너레이터여도 되며, 각 파일은 받는 즉시 기록됩니다.
+    """
+    writer = open_report_writer(output_file, with_index)
+    try:
+        for file_path, parsed_data in reports:
+            writer.append(file_path, parsed_data)
+    except BaseException:
+        writer.discard()
+        raise
+    writer.close()
+
+# ------------------ 작업 기록(이어서 처리) ------------------ #
+# 파일별 상태와 화면에 보일 이름: pending → parsed → written / failed
+MANIFEST_STATES = {
+    "pending": "대기",
+    "parsed": "파싱됨",
+    "written": "완료",
+    "failed": "실패",
+}
+# 엑셀이 잠근 파일을 다시 시도하기 전 기다리는 시간(초), 모두 실패하면 오류로 기록
+RETRY_DELAYS = (1, 2, 4, 8)
+
+def is_lock_error(error):
+    """
+    다른 프로그램(엑셀)이 파일을 열고 있어 생긴 오류인지 확인합니다. (Windows 공유 위반 32, 잠금 위반 33)
+    """
+    return isinstance(error, PermissionError) or getattr(error, "winerror", None) in (32, 33)
+
+def retry_locked(func, *args, delays=RETRY_DELAYS, wait=time.sleep, on_retry=None):
+    """
+    func(*args) 가 파일 잠금으로 실패하면 delays 간격으로 다시 시도합니다.
+    wait(초) 가 참을 반환하면(취소) 더 기다리지 않고 마지막 오류를 그대로 냅니다.
+    on_retry(오류, 대기 시간) 는 다시 시도하기 전에 호출됩니다.
+    """
+    for delay in delays:
+        try:
+            return func(*args)
+        except OSError as e:
+            if not is_lock_error(e):
+                raise
+            if on_retry is not None:
+                on_retry(e, delay)
+            if wait(delay):
+                raise
+    return func(*args)
+
+def default_manifest_path(kind, file_paths):
+    """
+    작업 종류와 파일 목록으로 정해지는 작업 기록 경로입니다. 같은 파일들을 다시 고르면 같은 기록을 찾습니다.
+    """
+    key = "\n".join([kind] + sorted(os.path.abspath(file_path) for file_path in file_paths))
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(app_data_dir(), "jobs", f"{kind}-{digest}.json")
+
+def new_manifest_entry():
+    return {"state": "pending", "error": None, "seconds": None, "attempts": 0, "sheet": None, "sheets": None,
+            "run": 0}
+
+class BatchManifest:
+    """
+    여러 파일에 시트를 추가하는 작업의 파일별 상태(MANIFEST_STATES)를 JSON 파일로 기록합니다.
+    - 상태가 바뀔 때마다 저장(checkpoint)하므로 중간에 종료되어도 완료된 파일을 건너뛰고 이어서 처리할 수 있습니다.
+    - 파일을 처리하기 전에 시트 이름을 적어 두어(check), 시트를 붙인 직후 기록 전에 종료된 파일도 다시 붙이지 않습니다.
+    - 모든 파일이 끝난 기록은 complete 로 표시되며, 같은 파일들로 다시 시작하면 처음부터 처리합니다.
+    """
+    def __init__(self, path, file_paths):
+        self.path = path
+        self.lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            saved = {}
+        if saved.get("complete"):
+            saved = {}
+        saved_files = saved.get("files", {})
+        self.run = saved.get("run", 0) + 1
+        self.files = {}
+        for file_path in file_paths:
+            entry = saved_files.get(os.path.abspath(file_path))
+            if not isinstance(entry, dict) or entry.get("state") not in MANIFEST_STATES:
+                entry = new_manifest_entry()
+            self.files[os.path.abspath(file_path)] = entry
+
+    def completed(self):
+        return [file_path for file_path, entry in self.files.items() if entry["state"] == "written"]
+
+    def resumable(self):
+        """
+        이전 실행에서 일부만 끝난 기록이면 True 입니다.
+        """
+        done = len(self.completed())
+        return 0 < done < len(self.files)
+
+    def reset(self):
+        for file_path in self.files:
+            self.files[file_path] = new_manifest_entry()
+
+    def remaining(self):
+        """
+        아직 완료되지 않은 파일 목록입니다. 통합문서를 열지 않으므로 GUI 스레드에서 불러도 됩니다.
+        """
+        return [file_path for file_path, entry in self.files.items() if entry["state"] != "written"]
+
+    def check(self, file_path, save=True):
+        """
+        파일을 처리하기 직전에 통합문서의 시트 이름을 확인합니다. (작업 스레드에서 호출)
+        이전 실행에서 시트를 붙였는데 완료로 기록되지 않은 파일은 새 보고서 시트가 있으면 완료로 바꾸고 True 를 반환합니다.
+        처음 처리하는 파일은 지금 시트 이름을 적어 둡니다.
+        """
+        entry = self.files[os.path.abspath(file_path)]
+        try:
+            names = workbook_sheet_names(file_path) if can_stream(file_path) else None
+        except (OSError, ValueError, zipfile.BadZipFile, KeyError):
+            names = None
+        with self.lock:
+            written = False
+            if names is not None and entry["sheets"] is not None:
+                added = [name for name in names if name not in entry["sheets"]
+                         and name.lower().startswith(REPORT_SHEET.lower())]
+                if added:
+                    entry.update(state="written", error=None, sheet=added[-1])
+                    written = True
+            if not written and entry["sheets"] is None:
+                entry["sheets"] = names
+            if save:
+                self.save()
+        return written
+
+    def prepare(self):
+        """
+        남은 파일마다 check() 를 한 뒤 남은 파일 목록을 반환하고 기록을 한 번 저장합니다. (명령줄 일괄 처리용)
+        """
+        remaining = [file_path for file_path in self.remaining() if not self.check(file_path, save=False)]
+        self.save()
+        return remaining
+
+    def begin(self, file_path):
+        with self.lock:
+            entry = self.files[os.path.abspath(file_path)]
+            entry["attempts"] += 1
+            entry["run"] = self.run
+
+    def mark(self, file_path, state, **fields):
+        """
+        파일 하나의 상태를 바꾸고 바로 저장합니다. (작업 스레드에서 호출해도 됨)
+        """
+        with self.lock:
+            entry = self.files[os.path.abspath(file_path)]
+            entry.update(fields, state=state, run=self.run)
+            self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        complete = all(entry["state"] == "written" for entry in self.files.values())
+        write_json_atomic(self.path, {"run": self.run, "complete": complete, "files": self.files})
+
+    def counts(self):
+        counts = {state: 0 for state in MANIFEST_STATES}
+        for entry in self.files.values():
+            counts[entry["state"]] += 1
+        return counts
+
+    def rows(self):
+        """
+        요약 표의 (파일, 상태, 시도 횟수, 소요 시간, 오류) 행을 실패한 파일부터 반환합니다.
+        """
+        rows = []
+        for file_path, entry in self.files.items():
+            state = MANIFEST_STATES[entry["state"]]
+            if entry["state"] == "written" and entry["run"] != self.run:
+                state += " (이전 실행)"
+            seconds = f"{entry['seconds']:.2f}s" if entry["seconds"] is not None else ""
+            rows.append((os.path.basename(file_path), state, entry["attempts"], seconds, entry["error"] or ""))
+        # 실패한 파일을 먼저 (나머지는 파일 순서 그대로)
+        return sorted(rows, key=lambda row: row[1] != MANIFEST_STATES["failed"])
+
+# ------------------ 백그라운드 작업 ------------------ #
+def count_items(parsed_data):
+    """
+    파싱 결과에 들어 있는 항목 수를 셉니다.
+    """
+    return sum(len(category) for category in parsed_data)
+
+class BackgroundJob:
+    """
+    파일 목록을 GUI 스레드 밖에서 하나씩 처리하고, 진행 상황을 큐로 돌려줍니다.
+    - work(file_path, timer) 는 작업 스레드에서 실행되며 파싱 결과를 반환합니다.
+    - finish(timer) 는 모든 파일을 처리한 뒤 작업 스레드에서 한 번 실행됩니다. (취소 시 생략)
+    - abort() 는 취소되었을 때 finish 대신 작업 스레드에서 실행됩니다. (창을 닫아 취소된 경우 포함)
+    - timer 는 파일마다 새로 만드는 StageTimer 로, 단계별 시간을 기록합니다.
+    - 취소는 파일 사이에서만 확인하므로, 쓰고 있던 파일은 끝까지 저장됩니다.
+    큐 메시지: ("file", 순번, 경로, 결과, 소요 시간, 오류, timer) / ("finish", 오류, timer) / ("done", 취소 여부)
+              / ("notice", 알림) - notify() 로 보낸 알림은 다음 파일이 끝날 때까지 진행 표시줄 끝에 보입니다.
+    """
+    def __init__(self, title, file_paths, work, finish=None):
+        self.title = title
+        self.file_paths = list(file_paths)
+        self.work = work
+        self.finish = finish
+        self.abort = None
+        self.queue = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.thread = threading.Thread(target=self.run)
+
+        # 아래 값은 GUI 스레드에서만 갱신합니다.
+        self.done = 0
+        self.items = 0
+        self.errors = []
+        self.results = []   # 파일별 (경로, 오류, 소요 시간)
+        self.started = None
+        self.cache_start = None   # 시작할 때의 캐시 (적중, 미적중) 횟수
+        self.cache_text = ""      # 끝난 뒤 이번 작업의 캐시 적중/미적중 요약
+        self.notice = ""          # 진행 표시줄에 덧붙일 알림 (잠긴 파일 재시도 등)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.thread.start()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def notify(self, text):
+        """
+        작업 스레드에서 진행 표시줄에 보일 알림을 보냅니다.
+        """
+        self.queue.put(("notice", text))
+
+    def run(self):
+        self.run_files()
+        if self.finish is not None and not self.cancel_event.is_set():
+            timer = StageTimer(self.title)
+            try:
+                self.finish(timer)
+                self.queue.put(("finish", None, timer))
+            except Exception as e:
+                self.queue.put(("finish", str(e), timer))
+        elif self.abort is not None and self.cancel_event.is_set():
+            try:
+                self.abort()
+            except Exception:
+                pass
+        self.queue.put(("done", self.cancel_event.is_set()))
+
+    def run_files(self):
+        for idx, file_path in enumerate(self.file_paths):
+            if self.cancel_event.is_set():
+                break
+            timer = StageTimer(file_path)
+            start = time.perf_counter()
+            try:
+                parsed_data = self.work(file_path, timer)
+            except Exception as e:
+                self.queue.put(("file", idx, file_path, [], time.perf_counter() - start, str(e), timer))
+                continue
+            self.queue.put(("file", idx, file_path, parsed_data, time.perf_counter() - start, None, timer))
+
+    def messages(self):
+        """
+        지금까지 쌓인 메시지를 모두 꺼냅니다. (기다리지 않음)
+        """
+        while True:
+            try:
+                yield self.queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def progress_text(self):
+        elapsed = time.perf_counter() - self.started
+        total = len(self.file_paths)
+        rate = self.items / elapsed if elapsed > 0 else 0.0
+        text = f"{self.title}: {self.done}/{total} 파일 | {rate:,.0f} 항목/s"
+        if 0 < self.done < total:
+            eta = elapsed / self.done * (total - self.done)
+            text += f" | 남은 시간 약 {eta:.0f}초"
+        if self.notice:
+            text += f" | {self.notice}"
+        return text
+
+# 여러 파일 작업의 단계 나누기
+PIPELINE_WORKERS = 2   # 파싱 스레드 수 (읽기/쓰기를 기다리는 동안 다른 파일을 파싱)
+PIPELINE_AHEAD = 4     # 읽기를 시작했지만 아직 쓰지 않은 파일의 최대 수 (미리 읽은 내용이 차지하는 메모리 상한)
+
+def read_file_bytes(file_path):
+    """
+    파일 내용과, 읽기 직전의 크기/수정시각(os.stat_result)을 (내용, stat) 으로 반환합니다.
+    캐시 index 에는 이 stat 을 적어야 나중에 파싱하는 사이 저장된 파일을 옛 내용의 해시로 기억하지 않습니다.
+    """
+    with open(file_path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        return f.read(), stat
+
+def chain_stages(read, parse, write=None):
+    """
+    PipelineJob 의 세 단계를 파일 하나씩 차례로 실행하는 work(file_path, timer) 로 묶습니다. (프로파일링용)
+    """
+    def work(file_path, timer):
+        parsed_data = parse(file_path, timer, read(file_path, timer))
+        if write is not None:
+            write(file_path, parsed_data, timer)
+        return parsed_data
+    return work
+
+class PipelineJob(BackgroundJob):
+    """
+    여러 파일을 읽기 → 파싱 → 쓰기 단계로 나누어 겹쳐 처리합니다.
+    - 읽기 스레드가 파일 내용을 미리 메모리로 읽고, 파싱 스레드 workers 개가 파싱하며,
+      작업 스레드가 입력 순서대로 하나씩 씁니다. (쓰기는 한 스레드뿐이므로 통합 파일 순서도 그대로)
+    - 읽기를 시작해 아직 쓰지 않은 파일은 최대 ahead 개이므로, 느린 단계 앞에 내용이 한없이 쌓이지 않습니다.
+    - 느린 네트워크 드라이브에서도 전체 시간이 단계별 시간의 합이 아니라 가장 느린 단계에 가까워집니다.
+    read(file_path, timer) → 내용, parse(file_path, timer, 내용) → 결과, write(file_path, 결과, timer)
+    큐 메시지와 취소 방식은 BackgroundJob 과 같습니다. (취소하면 미리 읽은 파일은 쓰지 않음)
+    """
+    def __init__(self, title, file_paths, read, parse, write=None, finish=None,
+                 workers=PIPELINE_WORKERS, ahead=PIPELINE_AHEAD):
+        super().__init__(title, file_paths, chain_stages(read, parse, write), finish)
+        self.read = read
+        self.parse = parse
+        self.write = write
+        self.workers = workers
+        self.slots = threading.Semaphore(max(ahead, 1))
+        self.pending = queue.Queue()   # 입력 순서대로 (순번, 경로, timer, 시작 시각, 파싱 future, 읽기 오류)
+
+    def take_slot(self):
+        """
+        읽을 자리가 날 때까지 기다립니다. 그 사이 취소되면 False 를 반환합니다.
+        """
+        while not self.slots.acquire(timeout=0.1):
+            if self.cancel_event.is_set():
+                return False
+        if self.cancel_event.is_set():
+            self.slots.release()
+            return False
+        return True
+
+    def read_files(self, pool):
+        """
+        읽기 스레드: 자리가 날 때마다 다음 파일을 읽어 파싱 스레드에 넘깁니다.
+        """
+        try:
+            for idx, file_path in enumerate(self.file_paths):
+                if not self.take_slot():
+                    break
+                timer = StageTimer(file_path)
+                start = time.perf_counter()
+                try:
+                    data = self.read(file_path, timer)
+                except Exception as e:
+                    self.pending.put((idx, file_path, timer, start, None, str(e)))
+                    continue
+                future = pool.submit(self.parse, file_path, timer, data)
+                self.pending.put((idx, file_path, timer, start, future, None))
+        finally:
+            self.pending.put(None)
+
+    def run_files(self):
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        reader = threading.Thread(target=self.read_files, args=(pool,))
+        reader.start()
+        try:
+            while True:
+                item = self.pending.get()
+                if item is None:
+                    break
+                idx, file_path, timer, start, future, error = item
+                try:
+                    if self.cancel_event.is_set():
+                        if future is not None:
+                            future.cancel()
+                        continue
+                    parsed_data = []
+                    if error is None:
+                        try:
+                            parsed_data = future.result()
+                            if self.write is not None:
+                                self.write(file_path, parsed_data, timer)
+                        except Exception as e:
+                            parsed_data = []
+                            error = str(e)
+                    self.queue.put(("file", idx, file_path, parsed_data, time.perf_counter() - start, error, timer))
+                finally:
+                    # 이 파일이 차지하던 자리를 비워 다음 파일을 읽게 함
+                    self.slots.release()
+        finally:
+            reader.join()
+            pool.shutdown(wait=True)
+
+# ------------------ 변경 감시 ------------------ #
+WATCH_INTERVAL_MS = 500   # 감시 주기
+WATCH_DEBOUNCE = 1.0      # 크기/수정시각이 이 시간(초) 동안 그대로여야 다시 파싱 (저장 중인 파일 제외)
+
+def file_signature(file_path):
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+def is_locked(file_path):
+    """
+    지금 파일을 읽을 수 없으면 True 입니다. (다른 프로그램이 쓰는 중이거나 .xlsx 압축이 아직 완성되지 않음)
+    """
+    try:
+        with open(file_path, "rb") as f:
+            if can_stream(file_path):
+                return not zipfile.is_zipfile(f)
+    except OSError:
+        return True
+    return False
+
+class FileWatcher:
+    """
+    파일 또는 폴더 안의 엑셀 파일을 크기/수정시각으로 감시합니다.
+    - 바뀐 파일은 debounce 초 동안 더 바뀌지 않고 잠겨 있지 않을 때 한 번만 알려줍니다.
+    - prime() 으로 현재 상태를 기준으로 삼으면 이미 표시한 파일은 다시 알려주지 않습니다.
+    """
+    def __init__(self, targets, debounce=WATCH_DEBOUNCE):
+        self.targets = list(targets)
+        self.debounce = debounce
+        self.seen = {}      # 마지막으로 알려준 (크기, 수정시각)
+        self.pending = {}   # 바뀐 뒤 안정되기를 기다리는 파일: ((크기, 수정시각), 처음 본 시각)
+
+    def files(self):
+        found = []
+        for target in self.targets:
+            if os.path.isdir(target):
+                found.extend(collect_files([target]))
+            elif os.path.isfile(target):
+                found.append(target)
+        return found
+
+    def prime(self):
+        for file_path in self.files():
+            try:
+                self.seen[file_path] = file_signature(file_path)
+            except OSError:
+                continue
+
+    def poll(self, now=None):
+        """
+        (다시 파싱할 파일 목록, 없어진 파일 목록)을 반환합니다.
+        """
+        now = time.monotonic() if now is None else now
+        ready = []
+        current = set()
+        for file_path in self.files():
+            current.add(file_path)
+            try:
+                signature = file_signature(file_path)
+            except OSError:
+                continue   # 저장하면서 잠시 없어진 경우
+            if self.seen.get(file_path) == signature:
+                self.pending.pop(file_path, None)
+                continue
+            waiting = self.pending.get(file_path)
+            if waiting is None or waiting[0] != signature:
+                self.pending[file_path] = (signature, now)
+                continue
+            if now - waiting[1] < self.debounce or is_locked(file_path):
+                continue
+            del self.pending[file_path]
+            self.seen[file_path] = signature
+            ready.append(file_path)
+
+        removed = [file_path for file_path in self.seen if file_path not in current]
+        for file_path in removed:
+            del self.seen[file_path]
+        for file_path in [file_path for file_path in self.pending if file_path not in current]:
+            del self.pending[file_path]
+        return ready, removed
+
+# ------------------ Treeview 표시 ------------------ #
+# 이 행 수를 넘으면 보이는 행만 Tk 항목으로 만드는 가상 모드로 표시
+VIRTUAL_THRESHOLD = 2000
+# 일반 모드에서 유휴 시간마다 한 번에 넣을 행 수
+TREE_BATCH = 500
+# 보고서 텍스트를 유휴 시간마다 나눠 넣을 때 한 번에 넣는 대략의 줄 수 (클립보드도 같은 크기로 나눔)
+TEXT_BATCH = 2000
+# 가상 모드에서 보이는 행 외에 미리 만들어 둘 여유 행 수
+VIRTUAL_MARGIN = 10
+
+def sheet_headers(parsed_data):
+    """
+    중분류마다 앞에 "[시트 이름]" 머리줄을 둘지 여부입니다. (여러 시트 결과에서 시트가 바뀌는 첫 중분류)
+    """
+    headers = []
+    sheet = None
+    for category in parsed_data:
+        header = category.sheet is not None and category.sheet != sheet
+        if header:
+            sheet = category.sheet
+        headers.append(header)
+    return headers
+
+def category_block(category, lines, header=False):
+    """
+    중분류 하나의 (Treeview 행 목록, 보고서 텍스트 조각)을 만듭니다.
+    """
+    rows = []
+    if header:
+        rows.append((f"[{category.sheet}]", "", ""))
+    cat = category.label          # e.g., "1. 사업인건비"
+    amt = category.total_text()   # e.g., "500" or ""
+
+    if lines:
+        # 첫 번째 항목과 함께 중분류 표시
+        rows.append((cat, lines[0], amt))
+        # 이후 항목은 중분류 없이 내용과 금액만 표시
+        rows.extend(("", line, "") for line in lines[1:])
+    else:
+        # 중분류만 표시하고 내용과 금액은 비워둠
+        rows.append((cat, "", ""))
+    return rows, "\n".join(category_text_lines(category, lines, header))
+
+def report_blocks(parsed_data, item_lines=None):
+    """
+    중분류별 (Treeview 행 목록, 보고서 텍스트 조각) 목록입니다. 바뀐 중분류만 다시 그릴 때 단위가 됩니다.
+    """
+    if item_lines is None:
+        item_lines = render_lines(parsed_data)
+    return [
+        category_block(category, lines, header)
+        for category, lines, header in zip(parsed_data, item_lines, sheet_headers(parsed_data))
+    ]
+
+def report_rows(parsed_data, item_lines=None):
+    """
+    파싱 결과를 Treeview 한 줄씩의 (중분류, 내용, 금액) 값으로 펼칩니다.
+    여러 시트를 파싱한 결과는 시트마다 "[시트 이름]" 줄을 먼저 둡니다.
+    """
+    for rows, _ in report_blocks(parsed_data, item_lines):
+        yield from rows
+
+def changed_categories(old, new):
+    """
+    같은 위치의 중분류끼리 비교해 다시 그려야 하는 새 결과의 번호 목록을 반환합니다.
+    (내용이 같아도 시트 머리줄 여부가 바뀌었거나 새로 생긴 중분류는 포함)
+    """
+    old_headers = sheet_headers(old)
+    new_headers = sheet_headers(new)
+    return [
+        idx for idx, category in enumerate(new)
+        if idx >= len(old) or category != old[idx] or new_headers[idx] != old_headers[idx]
+    ]
+
+class ReportTable:
+    """
+    보고서 행을 Treeview 에 채우는 표시 계층입니다.
+    - 행이 VIRTUAL_THRESHOLD 이하이면 유휴 시간마다 TREE_BATCH 개씩 나눠 삽입합니다.
+    - 넘으면 보이는 행 + VIRTUAL_MARGIN 개만 Tk 항목으로 만들고, 스크롤할 때 값만 바꿔 끼웁니다.
+    - 비울 때는 delete 한 번으로 모든 항목을 지웁니다.
+    """
+    def __init__(self, tree, vsb):
+        self.tree = tree
+        self.vsb = vsb
+        self.rows = []
+        self.virtual = False
+        self.offset = 0
+        self.pool = []
+        self.fill_id = None
+
+        self.tree.bind("<Configure>", self.on_configure, add="+")
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self.on_wheel, add="+")
+        self.set_native_scroll()
 
-    # 중분류와 항목 파싱
-    cat_counter = 0
-    group_dict = {}
-    last_main_item = None
+    def set_native_scroll(self):
+        self.vsb.configure(command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.vsb.set)
 
-    for idx, row in needed.iterrows():
-        raw_cat = str(row["raw_cat"]).strip() if pd.notna(row["raw_cat"]) else ""
+    def set_rows(self, rows):
+        self.clear()
+        self.rows = list(rows)
+        if len(self.rows) > VIRTUAL_THRESHOLD:
+            self.virtual = True
+            self.vsb.configure(command=self.on_scroll)
+            self.tree.configure(yscrollcommand="")
+            self.render()
+        else:
+            self.fill_batch(0)
 
-        if re.match(r"^\d+\)", raw_cat):  # 중분류인지 확인  ")" 닫는 괄호로 판단함
-            cat_counter += 1
-            middle_name = re.sub(r"^\d+\)", "", raw_cat).strip()
-            final_label = f"{cat_counter}. {middle_name}" # 
-            if final_label not in group_dict:
-                group_dict[final_label] = {"items": [], "total": 0}
-            continue
+    def splice(self, start, count, rows):
+        """
+        start 번째부터 count 개 행을 rows 로 바꿉니다. 나머지 행의 Tk 항목은 건드리지 않습니다.
+        """
+        rows = list(rows)
+        self.rows[start:start + count] = rows
+        if self.fill_id is not None or (not self.virtual and len(self.rows) > VIRTUAL_THRESHOLD):
+            # 아직 채우는 중이거나 가상 모드로 바꿔야 하면 전체를 다시 채움
+            self.set_rows(self.rows)
+        elif self.virtual:
+            self.render()
+        else:
+            children = self.tree.get_children()
+            if count == len(rows):
+                for iid, values in zip(children[start:start + count], rows):
+                    self.tree.item(iid, values=values)
+                return
+            if count:
+                self.tree.delete(*children[start:start + count])
+            for offset, values in enumerate(rows):
+                self.tree.insert("", start + offset, values=values)
 
-        # 현재 카테고리가 없는 경우 처리하지 않음
-        if not group_dict:
-            continue
+    def clear(self):
+        if self.fill_id is not None:
+            self.tree.after_cancel(self.fill_id)
+            self.fill_id = None
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self.rows = []
+        self.pool = []
+        self.offset = 0
+        if self.virtual:
+            self.virtual = False
+            self.set_native_scroll()
 
-        current_cat = list(group_dict.keys())[-1]
+    # 일반 모드 -------------------------------------------------
+    def fill_batch(self, start):
+        end = min(start + TREE_BATCH, len(self.rows))
+        for values in self.rows[start:end]:
+            self.tree.insert("", "end", values=values)
+        if end < len(self.rows):
+            self.fill_id = self.tree.after_idle(self.fill_batch, end)
+        else:
+            self.fill_id = None
 
-        # 항목 세부정보 가져오기
-        item_name = str(row["항목명"]).strip()
+    # 가상 모드 -------------------------------------------------
+    def visible_count(self):
+        style = ttk.Style(self.tree)
+        try:
+            row_height = int(style.lookup("Treeview", "rowheight") or 20)
+        except (tk.TclError, ValueError):
+            row_height = 20
+        # 머리글 한 줄을 뺀 높이
+        return max(1, self.tree.winfo_height() // row_height - 1)
 
-        if item_name.startswith("-"):
-            # 이전 항목명 상속
-            if last_main_item is not None:
-                item_name = last_main_item
+    def render(self):
+        """
+        현재 위치(offset)부터 보이는 만큼의 행 값을 Tk 항목에 채웁니다.
+        """
+        visible = self.visible_count()
+        size = min(len(self.rows), visible + VIRTUAL_MARGIN)
+        while len(self.pool) < size:
+            self.pool.append(self.tree.insert("", "end", values=("", "", "")))
+        while len(self.pool) > size:
+            self.tree.delete(self.pool.pop())
 
-        else:
-            # 새로운 주요 항목으로 설정
-            last_main_item = item_name
+        self.offset = max(0, min(self.offset, len(self.rows) - visible))
+        for idx, iid in enumerate(self.pool):
+            pos = self.offset + idx
+            self.tree.item(iid, values=self.rows[pos] if pos < len(self.rows) else ("", "", ""))
+        self.tree.yview_moveto(0)
 
-        unit_price = row["단가"]
-        qty = row["갯수"]
-        qty_unit = row["갯수단위"]
-        freq1 = row["횟수1"]
-        freq1_unit = row["횟수1단위"]
-        freq2 = row["횟수2"]
-        freq2_unit = row["횟수2단위"]
-        amount = row["금액"]
+        total = len(self.rows)
+        self.vsb.set(self.offset / total, min(1.0, (self.offset + visible) / total))
 
-        # 금액이 있는 항목만 처리
-        if pd.notna(amount) and amount != 0:
-            expr_str = make_expression(
-                item_name,
-                unit_price,
-                qty,
-                qty_unit,
-                freq1,
-                freq1_unit,
-                freq2,
-                freq2_unit,
-                amount
-            )
-            group_dict[current_cat]["items"].append(expr_str)
-            group_dict[current_cat]["total"] += amount
+    def on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.offset = int(float(amount) * len(self.rows))
+        elif unit == "pages":
+            self.offset += int(amount) * self.visible_count()
+        else:
+            self.offset += int(amount)
+        self.render()
 
-    # 최종 데이터 변환
-    results = []
-    for cat, info in group_dict.items():
-        total = info["total"]
-        total_val = add_commas(int(total)) if total != 0 else ""
-        results.append({
-            "구분": cat,
-            "내용": "\n".join(info["items"]),
-            "금액": total_val
-        })
+    def on_wheel(self, event):
+        if not self.virtual:
+            return None
+        if event.num == 4:
+            step = -3
+        elif event.num == 5:
+            step = 3
+        else:
+            step = -3 if event.delta > 0 else 3
+        self.offset += step
+        self.render()
+        return "break"
 
-    return results
+    def on_configure(self, event):
+        if self.virtual:
+            self.render()
 
-def build_final_report(parsed_list):
+class ReportText:
     """
-    최종 보고서 텍스트를 생성합니다.
+    최종 보고서 텍스트를 Text 위젯에 채우는 표시 계층입니다.
+    - 중분류마다 cat0, cat1 ... 태그를 붙여 나중에 그 부분만 바꿀 수 있게 합니다.
+    - 유휴 시간마다 TEXT_BATCH 줄 정도씩 나눠 넣어 큰 보고서에서도 창이 멈추지 않습니다.
     """
-    if not parsed_list:
-        return "데이터가 없습니다."
+    def __init__(self, text):
+        self.text = text
+        self.blocks = []   # 중분류별 텍스트 조각
+        self.filled = 0    # 위젯에 넣은 조각 수
+        self.fill_id = None
 
-    lines = []
-    for item in parsed_list:
-        cat = item["구분"]  # e.g., "1. 사업인건비"
-        content = item["내용"]  # e.g., "- 인쇄비 : 50×10월=500\n- 복사료 : ..."
-        amount = item["금액"]  # e.g., 500 or ""
+    def set_blocks(self, blocks):
+        self.clear()
+        self.blocks = list(blocks)
+        self.fill_batch()
+
+    def set_message(self, message):
+        self.clear()
+        self.text.insert("1.0", message)
+
+    def insert_batch(self):
+        chunks = []
+        lines = 0
+        while self.filled < len(self.blocks) and lines < TEXT_BATCH:
+            idx = self.filled
+            if idx:
+                chunks += ["\n\n", ()]
+            chunks += [self.blocks[idx], (f"cat{idx}",)]
+            lines += self.blocks[idx].count("\n") + 1
+            self.filled += 1
+        if chunks:
+            self.text.insert("end-1c", *chunks)
+
+    def fill_batch(self):
+        self.insert_batch()
+        if self.filled < len(self.blocks):
+            self.fill_id = self.text.after_idle(self.fill_batch)
+        else:
+            self.fill_id = None
+
+    def finish(self):
+        """
+        아직 넣지 않은 조각을 바로 모두 넣습니다. (태그 범위로 고치기 전에 호출)
+        """
+        if self.fill_id is not None:
+            self.text.after_cancel(self.fill_id)
+            self.fill_id = None
+        while self.filled < len(self.blocks):
+            self.insert_batch()
 
-        # If amount is not empty, format with commas
-        amount_str = amount
+    def replace(self, idx, text):
+        tag = f"cat{idx}"
+        start, end = self.text.tag_ranges(tag)
+        self.text.delete(start, end)
+        self.text.insert(start, text, (tag,))
+        self.blocks[idx] = text
 
-        # Combine into desired format
-        line = f"{cat} | {content} | {amount_str}"
-        lines.append(line)
+    def append(self, text):
+        idx = len(self.blocks)
+        self.text.insert("end-1c", "\n\n", (), text, (f"cat{idx}",))
+        self.blocks.append(text)
+        self.filled += 1
+
+    def truncate(self, count):
+        """
+        count 번째 중분류부터 끝까지 지웁니다. (count 는 1 이상)
+        """
+        self.text.delete(self.text.tag_ranges(f"cat{count - 1}")[1], "end-1c")
+        for idx in range(count, len(self.blocks)):
+            self.text.tag_delete(f"cat{idx}")
+        del self.blocks[count:]
+        self.filled = len(self.blocks)
 
-    # Join all categories with double newline
-    report_text = "\n\n".join(lines)
-    return report_text
+    def clear(self):
+        if self.fill_id is not None:
+            self.text.after_cancel(self.fill_id)
+            self.fill_id = None
+        self.text.delete("1.0", "end")
+        tags = [tag for tag in self.text.tag_names() if tag.startswith("cat")]
+        if tags:
+            self.text.tag_delete(*tags)
+        self.blocks = []
+        self.filled = 0
 
 # ------------------ GUI ------------------ #
 class MyApp(tk.Tk):
@@ -190,6 +2393,11 @@ class MyApp(tk.Tk):
         super().__init__()
         self.title("예산 보고서 추출기 [충북대 소프트웨어학부 이규민, 윤준식]")
         self.geometry("800x700")
+
+        # 상태 표시줄 (마지막 파일의 단계별 소요 시간) - 창 아래쪽에 먼저 배치
+        self.var_status = tk.StringVar(value="준비")
+        lbl_status = tk.Label(self, textvariable=self.var_status, anchor="w", relief="sunken", bd=1)
+        lbl_status.pack(side="bottom", fill="x")
         
         # 파일 경로 표시
         lbl_file = tk.Label(self, text="엑셀 파일 경로:")
@@ -215,6 +2423,29 @@ class MyApp(tk.Tk):
         btn_export_sheet = tk.Button(frm_btns, text="기존 엑셀에 시트 추가", command=self.export_to_existing_excel)
         btn_export_sheet.pack(side="left", padx=5)
 
+        # 최종 보고서를 .txt/.md 파일 또는 클립보드로 (한 줄씩 흘려 씀)
+        btn_export_text = tk.Button(frm_btns, text="텍스트로 저장", command=self.export_report_text)
+        btn_export_text.pack(side="left", padx=5)
+
+        btn_copy_report = tk.Button(frm_btns, text="보고서 복사", command=self.copy_report)
+        btn_copy_report.pack(side="left", padx=5)
+
+        # 프로젝트별로 시트가 나뉜 통합문서는 예산 배치인 시트를 모두 읽음
+        self.var_all_sheets = tk.BooleanVar(value=False)
+        chk_all_sheets = tk.Checkbutton(frm_btns, text="모든 시트 읽기", variable=self.var_all_sheets)
+        chk_all_sheets.pack(side="left", padx=5)
+        self.all_sheets = False
+
+        # 파일(또는 폴더)을 감시하다가 저장되면 다시 파싱해 바뀐 중분류만 고침
+        self.var_watch = tk.BooleanVar(value=False)
+        chk_watch = tk.Checkbutton(frm_btns, text="변경 감시", variable=self.var_watch, command=self.toggle_watch)
+        chk_watch.pack(side="left", padx=5)
+
+        btn_watch_folder = tk.Button(frm_btns, text="폴더 감시", command=self.watch_folder)
+        btn_watch_folder.pack(side="left", padx=5)
+        self.watcher = None
+        self.watch_id = None
+
         # 안내 라벨
         lbl_info = tk.Label(self, text="<단독 파일 처리>", fg="blue", font=("굴림", 10, "bold"))
         lbl_info.pack(padx=10, pady=5)
@@ -231,6 +2462,21 @@ class MyApp(tk.Tk):
 
         btn_export_sheet_multi_2_one = tk.Button(export_btns, text="여러 엑셀에서 한 파일로 내보내기", command=self.process_multiple_files_2_one)
         btn_export_sheet_multi_2_one.pack(side="left", padx=5)
+
+        self.var_index = tk.BooleanVar(value=False)
+        chk_index = tk.Checkbutton(export_btns, text="통합 파일에 파일목록 시트 추가", variable=self.var_index)
+        chk_index.pack(side="left", padx=5)
+
+        # 파싱한 항목을 저장소에 모아 두면 엑셀을 다시 열지 않고 여러 파일의 합계를 낼 수 있음
+        self.var_store = tk.BooleanVar(value=False)
+        chk_store = tk.Checkbutton(export_btns, text="항목 저장소에 기록", variable=self.var_store)
+        chk_store.pack(side="left", padx=5)
+
+        btn_export_rollup = tk.Button(export_btns, text="저장소 합계 내보내기", command=self.export_rollup)
+        btn_export_rollup.pack(side="left", padx=5)
+        self.record_items = False
+        self.item_store = None
+        self.store_errors = []   # 이번 작업에서 저장소에 기록하지 못한 (파일 경로, 오류)
         
         lbl_info2 = tk.Label(self, text="<복수 파일 처리>", fg="blue", font=("굴림", 10, "bold"))
         lbl_info2.pack(padx=10, pady=5)
@@ -238,6 +2484,27 @@ class MyApp(tk.Tk):
                             fg="black")
         lbl_info2.pack(padx=10, pady=5)
 
+        # 작업 중에는 다른 작업을 시작하지 못하도록 잠글 버튼들
+        self.action_buttons = [btn_select, btn_clear, btn_export_excel, btn_export_sheet,
+                               btn_export_text, btn_copy_report,
+                               btn_export_sheet_multi, btn_export_sheet_multi_2_one, btn_watch_folder,
+                               btn_export_rollup]
+
+        # 진행 상황 (백그라운드 작업)
+        frame_progress = tk.Frame(self)
+        frame_progress.pack(fill="x", padx=10, pady=5)
+        self.progress = ttk.Progressbar(frame_progress, mode="determinate")
+        self.progress.pack(side="left", fill="x", expand=True)
+        self.btn_cancel = tk.Button(frame_progress, text="취소", command=self.cancel_job, state="disabled")
+        self.btn_cancel.pack(side="left", padx=5)
+        self.var_profile = tk.BooleanVar(value=False)
+        chk_profile = tk.Checkbutton(frame_progress, text="프로파일링(다음 작업 1회)", variable=self.var_profile)
+        chk_profile.pack(side="left", padx=5)
+        self.var_progress = tk.StringVar(value="대기 중")
+        lbl_progress = tk.Label(self, textvariable=self.var_progress, anchor="w")
+        lbl_progress.pack(fill="x", padx=10)
+        self.job = None
+
         # 1) Treeview와 스크롤바를 담을 프레임 생성
         frame_tree = ttk.Frame(self)
         frame_tree.pack(fill="both", expand=True, padx=10, pady=5)
@@ -265,10 +2532,10 @@ class MyApp(tk.Tk):
         # 4) grid에 배치, 가득 채우도록 sticky 설정
         self.tree.grid(row=0, column=0, sticky="nsew")
 
-        # 5) 스크롤바 생성 및 grid 배치
-        vsb = ttk.Scrollbar(frame_tree, orient="vertical", command=self.tree.yview)
+        # 5) 스크롤바 생성 및 grid 배치 (세로 스크롤은 ReportTable 이 연결)
+        vsb = ttk.Scrollbar(frame_tree, orient="vertical")
         vsb.grid(row=0, column=1, sticky="ns") 
-        self.tree.configure(yscrollcommand=vsb.set)
+        self.table = ReportTable(self.tree, vsb)
 
         hsb = ttk.Scrollbar(frame_tree, orient="horizontal", command=self.tree.xview)
         hsb.grid(row=1, column=0, sticky="ew")
@@ -296,11 +2563,320 @@ class MyApp(tk.Tk):
         txt_hsb = ttk.Scrollbar(frame_text, orient="horizontal", command=self.txt_report.xview)
         txt_hsb.grid(row=1, column=0, sticky="ew")
         self.txt_report.configure(xscrollcommand=txt_hsb.set)
+        self.report_text = ReportText(self.txt_report)
         
         
         
         self.parsed_data = []
+        self.view_blocks = []   # 표시 중인 중분류별 (Treeview 행 목록, 보고서 텍스트 조각)
+
+        # 파싱 캐시 (캐시 폴더를 만들 수 없으면 캐시 없이 동작)
+        try:
+            self.cache = ParseCache()
+        except OSError:
+            self.cache = None
+
+        # 작업 중에 창을 닫으면 현재 파일까지만 처리하고 종료
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # 창이 그려진 뒤 pandas/openpyxl 을 백그라운드에서 불러옴
+        self.startup = StageTimer("startup")
+        self.preload = None
+        self.after_idle(self.on_ready)
     
+    def parse(self, file_path, timer=None, prefetched=None):
+        """
+        캐시를 거쳐 파싱합니다. 바뀌지 않은 파일은 엑셀을 다시 읽지 않습니다.
+        prefetched 는 prefetch 가 미리 읽어 둔 (파일 내용, stat) 으로, 있으면 파일 대신 그 내용을 파싱합니다.
+        작업 스레드에서 호출되므로 오류는 대화상자 대신 예외로 전달됩니다.
+        """
+        all_sheets = self.all_sheets
+        variant = SHEETS_VARIANT if all_sheets else ""
+        data, stat = prefetched if prefetched is not None else (None, None)
+        source = io.BytesIO(data) if data is not None else None
+        if self.cache is None:
+            parsed_data = parse_file(file_path, timer=timer, all_sheets=all_sheets, source=source)
+        else:
+            parsed_data = self.cache.parse(file_path, parse_file, "columnar", timer, all_sheets, source, timer=timer,
+                                           variant=variant, data=data, stat=stat)
+        if self.record_items:
+            with measure(timer, "store") as record:
+                try:
+                    digest = None
+                    if self.cache is not None:
+                        # 방금 계산한 해시를 다시 사용 (같은 내용이면 기록하지 않음)
+                        digest = self.cache.key(file_path, variant, data, stat)
+                    self.open_store().add(file_path, parsed_data, digest)
+                except (OSError, sqlite3.Error) as e:
+                    # 파싱은 성공했으므로 파일을 실패로 두지 않고 작업 결과에 따로 표시
+                    self.store_errors.append((file_path, str(e)))
+                    record["error"] = str(e)
+                else:
+                    record["rows"] = count_items(parsed_data)
+        return parsed_data
+
+    def prefetch(self, file_path, timer=None):
+        """
+        (읽기 단계) 파일 내용을 메모리로 읽어 (내용, stat) 으로 반환합니다. 캐시된 파일은 읽지 않고 None 을 반환합니다.
+        """
+        variant = SHEETS_VARIANT if self.all_sheets else ""
+        if self.cache is not None and self.cache.cached(file_path, variant):
+            return None
+        with measure(timer, "prefetch"):
+            return read_file_bytes(file_path)
+
+    def open_store(self):
+        if self.item_store is None:
+            self.item_store = ItemStore()
+        return self.item_store
+
+    def on_ready(self):
+        """
+        창이 처음 그려진 시점을 기록하고 무거운 모듈을 미리 불러오기 시작합니다.
+        """
+        self.startup.stages["window"] = {"seconds": time.perf_counter() - STARTED, "rows": None,
+                                         "peak_mb": peak_memory_mb()}
+        self.var_status.set(f"준비 (창 표시 {self.startup.stages['window']['seconds']:.2f}s, 엑셀 모듈 불러오는 중...)")
+
+        def load():
+            with self.startup.stage("modules"):
+                preload_modules()
+
+        self.preload = threading.Thread(target=load, daemon=True)
+        self.preload.start()
+        self.after(100, self.poll_preload)
+
+    def poll_preload(self):
+        if self.preload.is_alive():
+            self.after(100, self.poll_preload)
+            return
+        if self.job is None and "modules" in self.startup.stages:
+            self.var_status.set("준비 | " + self.startup.summary().split(" | ", 1)[1])
+        log_timing(self.startup)
+
+    def report_timing(self, timer):
+        """
+        단계별 기록을 상태 표시줄에 보여주고 timing.jsonl 에 남깁니다.
+        """
+        if not timer.stages:
+            return
+        self.var_status.set(timer.summary())
+        log_timing(timer)
+
+    def start_job(self, title, file_paths, work, on_file=None, on_done=None, finish=None, write=None, read=None,
+                  abort=None):
+        """
+        파일 작업을 백그라운드 스레드에서 시작합니다.
+        on_file(경로, 결과, 오류, timer) 와 on_done(job) 은 GUI 스레드에서 호출됩니다.
+        write(경로, 결과, timer) 를 주면 work 는 파싱 단계 work(경로, timer, 내용)가 되고,
+        read(기본값 prefetch)로 미리 읽기 → 파싱 → 쓰기를 겹쳐 처리합니다. (PipelineJob)
+        abort() 는 작업이 취소되면 finish 대신 작업 스레드에서 호출됩니다. (쓰던 파일 정리)
+        프로파일링을 켜 두면 이번 작업 한 번을 cProfile 로 기록합니다. (이때는 단계를 겹치지 않고 차례로 처리)
+        """
+        if self.job is not None:
+            messagebox.showinfo("정보", "이미 진행 중인 작업이 있습니다.")
+            return
+        # 작업 스레드에서 Tk 변수를 읽지 않도록 옵션을 미리 복사
+        self.all_sheets = self.var_all_sheets.get()
+        self.record_items = self.var_store.get()
+        self.store_errors = []
+        if self.record_items:
+            # 여러 파싱 스레드가 같은 저장소를 쓰도록 미리 열어 둠
+            try:
+                self.open_store()
+            except (OSError, sqlite3.Error) as e:
+                messagebox.showerror("저장소 오류", f"항목 저장소를 여는 중 오류가 발생했습니다.\n{e}")
+                return
+        read = read or self.prefetch
+        profile = None
+        if self.var_profile.get():
+            profile = cProfile.Profile()
+            if write is not None:
+                work = chain_stages(read, work, write)
+                write = None
+            work = profiled(work, profile)
+        if write is not None:
+            self.job = PipelineJob(title, file_paths, read, work, write, finish)
+        else:
+            self.job = BackgroundJob(title, file_paths, work, finish)
+        self.job.on_file = on_file
+        self.job.on_done = on_done
+        self.job.profile = profile
+        self.job.abort = abort
+        if self.cache is not None:
+            self.job.cache_start = self.cache.counts()
+
+        for btn in self.action_buttons:
+            btn.config(state="disabled")
+        self.btn_cancel.config(state="normal")
+        self.progress.configure(maximum=max(len(self.job.file_paths), 1), value=0)
+        self.var_progress.set(f"{title}: 0/{len(self.job.file_paths)} 파일")
+
+        self.job.start()
+        self.after(100, self.poll_job)
+
+    def poll_job(self):
+        """
+        작업 스레드가 보낸 메시지를 처리하고 진행 표시를 갱신합니다.
+        """
+        job = self.job
+        finished = False
+        for message in job.messages():
+            if message[0] == "file":
+                _, idx, file_path, parsed_data, elapsed, error, timer = message
+                job.done += 1
+                job.notice = ""
+                job.items += count_items(parsed_data)
+                job.results.append((file_path, error, elapsed))
+                if error is not None:
+                    job.errors.append((file_path, error))
+                if job.on_file is not None:
+                    job.on_file(file_path, parsed_data, error, timer)
+                self.report_timing(timer)
+            elif message[0] == "finish":
+                _, error, timer = message
+                if error is not None:
+                    job.errors.append(("", error))
+                self.report_timing(timer)
+            elif message[0] == "notice":
+                job.notice = message[1]
+            elif message[0] == "done":
+                finished = True
+
+        self.progress.configure(value=job.done)
+        self.var_progress.set(job.progress_text())
+
+        if not finished:
+            self.after(100, self.poll_job)
+            return
+
+        self.job = None
+        for btn in self.action_buttons:
+            btn.config(state="normal")
+        self.btn_cancel.config(state="disabled")
+        if job.cancelled():
+            self.var_progress.set(job.progress_text() + " | 취소됨")
+        if job.cache_start is not None and self.cache.counts() != job.cache_start:
+            # 창 모드 EXE 에는 콘솔이 없으므로 이번 작업의 캐시 적중/미적중은 진행 표시줄에 보임
+            job.cache_text = self.cache.stats(job.cache_start)
+            self.var_progress.set(self.var_progress.get() + " | " + job.cache_text)
+        if job.profile is not None:
+            self.save_profile(job.profile)
+        if job.on_done is not None:
+            job.on_done(job)
+
+    def save_profile(self, profile):
+        """
+        cProfile 결과를 사용자 폴더에 저장합니다. (python -m pstats 파일 로 확인)
+        """
+        self.var_profile.set(False)
+        profile_path = os.path.join(app_data_dir(), time.strftime("profile_%Y%m%d_%H%M%S.prof"))
+        try:
+            os.makedirs(app_data_dir(), exist_ok=True)
+            profile.dump_stats(profile_path)
+        except OSError as e:
+            messagebox.showerror("프로파일 오류", f"프로파일 결과를 저장하지 못했습니다.\n{e}")
+            return
+        self.var_status.set(f"프로파일 저장: {profile_path}")
+
+    def cancel_job(self):
+        if self.job is not None:
+            self.job.cancel()
+            self.btn_cancel.config(state="disabled")
+            self.var_progress.set(self.job.progress_text() + " | 취소 중... (현재 파일까지 처리)")
+
+    def on_close(self):
+        self.stop_watch()
+        if self.job is not None:
+            self.job.cancel()
+        self.destroy()
+
+    def export_rollup(self):
+        """
+        항목 저장소에 기록된 모든 파일의 중분류별/항목별/파일별 합계를 엑셀로 저장합니다.
+        """
+        try:
+            store = self.open_store()
+            files, items = store.counts()
+        except (OSError, sqlite3.Error) as e:
+            messagebox.showerror("저장소 오류", f"항목 저장소를 여는 중 오류가 발생했습니다.\n{e}")
+            return
+        if not files:
+            messagebox.showinfo("정보", "저장소에 기록된 파일이 없습니다.\n[항목 저장소에 기록]을 켜고 파일을 처리하세요.")
+            return
+
+        output_file = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            initialfile="예산합계.xlsx",
+            filetypes=[("Excel files", "*.xlsx")],
+            title="저장소 합계 내보내기"
+        )
+        if not output_file:
+            return
+
+        try:
+            store.export_rollup(output_file)
+            messagebox.showinfo("성공", f"파일 {files:,}개, 항목 {items:,}개의 합계를 '{output_file}'에 저장했습니다.")
+        except Exception as e:
+            messagebox.showerror("저장 오류", f"엑셀 파일로 저장하는 중 오류가 발생했습니다.\n{e}")
+
+    def job_summary(self, job, success_text, manifest=None):
+        """
+        여러 파일 작업이 끝난 뒤 파일별 결과를 표 하나로 보여줍니다. (파일마다 대화상자를 띄우지 않음)
+        manifest 가 있으면 이전 실행에서 끝낸 파일과 시도 횟수도 함께 보여줍니다.
+        """
+        if manifest is not None:
+            rows = manifest.rows()
+        else:
+            rows = [(os.path.basename(file_path), MANIFEST_STATES["failed" if error else "written"], 1,
+                     f"{elapsed:.2f}s", error or "")
+                    for file_path, error, elapsed in job.results]
+            rows.sort(key=lambda row: row[1] != MANIFEST_STATES["failed"])
+        rows += [("(저장)", MANIFEST_STATES["failed"], "", "", error) for file_path, error in job.errors if not file_path]
+        # 파싱은 성공했지만 항목 저장소에 기록하지 못한 파일
+        rows += [(os.path.basename(file_path), "저장소 기록 실패", "", "", error)
+                 for file_path, error in self.store_errors]
+
+        failed = sum(1 for row in rows if row[1] == MANIFEST_STATES["failed"])
+        ok = sum(1 for row in rows if row[1].startswith(MANIFEST_STATES["written"]))
+        text = f"{success_text}: {ok}개 성공, {failed}개 실패"
+        if self.store_errors:
+            text += f" | 저장소 기록 실패 {len(self.store_errors)}개"
+        if job.cache_text:
+            text += f" | {job.cache_text}"
+        if job.cancelled():
+            text += f" | 취소되어 {len(job.file_paths) - job.done}개 파일은 처리하지 않았습니다."
+        self.show_summary(job.title, text, rows, warn=bool(failed or self.store_errors))
+
+    def show_summary(self, title, text, rows, warn=False):
+        """
+        (파일, 상태, 시도, 시간, 오류) 표를 담은 결과 창을 띄웁니다. 모달이 아니므로 작업을 막지 않습니다.
+        """
+        win = tk.Toplevel(self)
+        win.title(f"{title} 결과")
+        win.geometry("700x400")
+        lbl_text = tk.Label(win, text=text, anchor="w", fg="red" if warn else "black")
+        lbl_text.pack(fill="x", padx=10, pady=5)
+
+        frame = ttk.Frame(win)
+        frame.pack(fill="both", expand=True, padx=10)
+        frame.rowconfigure(0, weight=1)
+        frame.columnconfigure(0, weight=1)
+        columns = ("col_file", "col_state", "col_attempts", "col_seconds", "col_error")
+        tree = ttk.Treeview(frame, columns=columns, show="headings")
+        for column, heading, width in zip(columns, ("파일", "상태", "시도", "시간", "오류"), (200, 90, 40, 60, 300)):
+            tree.heading(column, text=heading)
+            tree.column(column, width=width, anchor="w")
+        tree.grid(row=0, column=0, sticky="nsew")
+        vsb = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        vsb.grid(row=0, column=1, sticky="ns")
+        tree.configure(yscrollcommand=vsb.set)
+        for row in rows:
+            tree.insert("", "end", values=row)
+
+        btn_close = tk.Button(win, text="닫기", command=win.destroy)
+        btn_close.pack(pady=5)
+
     def select_file(self):
         file_path = filedialog.askopenfilename(
             title="엑셀 파일 선택",
@@ -312,56 +2888,171 @@ class MyApp(tk.Tk):
         self.file_path = file_path
         self.var_path.set(file_path)
         self.parse_and_show(file_path)
+        if self.var_watch.get():
+            self.start_watch([file_path], prime=True)
     
     def parse_and_show(self, file_path):
         self.clear_all()
+
+        def on_file(file_path, parsed_data, error, timer):
+            if error is not None:
+                messagebox.showerror("파일 오류", f"엑셀 파일을 읽는 중 오류가 발생했습니다.\n{error}")
+                return
+            if not parsed_data:
+                messagebox.showinfo("정보", "파싱된 데이터가 없습니다.")
+                return
+            self.show_parsed(parsed_data, timer)
+
+        # 파싱 (백그라운드)
+        self.start_job("파싱", [file_path], self.parse, on_file=on_file)
+
+    def show_parsed(self, parsed_data, timer=None):
+        """
+        파싱 결과를 Treeview 와 최종 보고서 텍스트에 표시합니다.
+        """
+        self.clear_all()
+        self.parsed_data = parsed_data
+
+        # 항목 문자열은 여기서 한 번만 만들어 Treeview 와 보고서 텍스트가 함께 씀
+        with measure(timer, "render") as record:
+            self.view_blocks = report_blocks(self.parsed_data)
+            record["rows"] = count_items(self.parsed_data)
+
+        # Treeview 표시 (일반 모드는 첫 묶음까지, 나머지는 유휴 시간에 채움)
+        with measure(timer, "tree") as record:
+            self.table.set_rows(row for rows, _ in self.view_blocks for row in rows)
+            record["rows"] = len(self.table.rows)
         
-        # 파싱
-        self.parsed_data = parse_excel(file_path)
-        
-        if not self.parsed_data:
-            messagebox.showinfo("정보", "파싱된 데이터가 없습니다.")
+        # 최종 보고서 텍스트 (첫 묶음까지, 나머지는 유휴 시간에 채움)
+        if not self.view_blocks:
+            self.report_text.set_message(build_final_report(self.parsed_data))
             return
-        
-        # Treeview 표시
-        for row in self.parsed_data:
-            cat = row["구분"]       # e.g., "1. 사업인건비"
-            desc = row["내용"]     # e.g., "- 인쇄비 : 50×10월=500\n- 복사료 : ..."
-            amt = row["금액"]      # e.g., 500 or ""
-            
-            if desc:
-                lines = desc.split('\n')
-                for idx, line in enumerate(lines):
-                    if idx == 0:
-                        # 첫 번째 항목과 함께 중분류 표시
-                        self.tree.insert("", "end", values=(cat, line, amt))
-                    else:
-                        # 이후 항목은 중분류 없이 내용과 금액만 표시
-                        self.tree.insert("", "end", values=("", line, ""))
+        self.report_text.set_blocks(text for _, text in self.view_blocks)
+
+    def update_parsed(self, parsed_data, timer=None):
+        """
+        새 파싱 결과를 표시 중인 결과와 중분류 단위로 비교해, 바뀐 중분류의 행과 텍스트만 고칩니다.
+        """
+        old = self.parsed_data
+        old_blocks = self.view_blocks
+        if not old or not parsed_data or len(old_blocks) != len(old):
+            self.show_parsed(parsed_data, timer)
+            return
+
+        with measure(timer, "render") as record:
+            changed = changed_categories(old, parsed_data)
+            headers = sheet_headers(parsed_data)
+            blocks = old_blocks[:len(parsed_data)]
+            for idx, lines in zip(changed, render_lines([parsed_data[idx] for idx in changed])):
+                block = category_block(parsed_data[idx], lines, headers[idx])
+                if idx < len(blocks):
+                    blocks[idx] = block
+                else:
+                    blocks.append(block)
+            record["rows"] = sum(len(parsed_data[idx]) for idx in changed)
+
+        with measure(timer, "tree") as record:
+            offsets = [0]
+            for rows, _ in old_blocks:
+                offsets.append(offsets[-1] + len(rows))
+            # 뒤쪽부터 고쳐야 앞쪽 중분류의 행 위치가 그대로임
+            if len(parsed_data) < len(old):
+                keep = offsets[len(parsed_data)]
+                self.table.splice(keep, offsets[-1] - keep, [])
+            elif len(parsed_data) > len(old):
+                self.table.splice(offsets[-1], 0, [row for rows, _ in blocks[len(old):] for row in rows])
+            for idx in reversed([idx for idx in changed if idx < len(old)]):
+                self.table.splice(offsets[idx], len(old_blocks[idx][0]), blocks[idx][0])
+            record["rows"] = sum(len(blocks[idx][0]) for idx in changed)
+
+        # 보고서 텍스트는 태그 범위로 바뀐 조각만 바꿔 끼움 (스크롤 위치 유지)
+        self.report_text.finish()
+        if len(parsed_data) < len(old):
+            self.report_text.truncate(len(parsed_data))
+        for idx in changed:
+            if idx < len(old):
+                self.report_text.replace(idx, blocks[idx][1])
             else:
-                # 중분류만 표시하고 내용과 금액은 비워둠
-                self.tree.insert("", "end", values=(cat, "", ""))
-        
-        # 최종 보고서 텍스트
-        final_text = build_final_report(self.parsed_data)
-        self.txt_report.insert("1.0", final_text)
+                self.report_text.append(blocks[idx][1])
+
+        self.parsed_data = parsed_data
+        self.view_blocks = blocks
     
     def clear_all(self):
         # Treeview 비우기
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        # Text 비우기
-        self.txt_report.delete("1.0", "end")
+        self.table.clear()
+        # Text 비우기 (중분류 태그도 함께 지움)
+        self.report_text.clear()
         self.parsed_data = []
+        self.view_blocks = []
+
+    # 변경 감시 -------------------------------------------------
+    def toggle_watch(self):
+        if not self.var_watch.get():
+            self.stop_watch()
+            self.var_status.set("변경 감시 중지")
+            return
+        if not hasattr(self, 'file_path') or not self.file_path:
+            messagebox.showinfo("정보", "먼저 [파일 선택]으로 감시할 파일을 선택하거나 [폴더 감시]를 사용하세요.")
+            self.var_watch.set(False)
+            return
+        # 지금 표시 중인 파일은 다시 읽지 않고, 이후 저장부터 반영
+        self.start_watch([self.file_path], prime=True)
+
+    def watch_folder(self):
+        folder = filedialog.askdirectory(title="감시할 폴더 선택")
+        if not folder:
+            return
+        self.var_path.set(folder)
+        self.var_watch.set(True)
+        # 폴더 안의 파일을 먼저 한 번 모두 파싱한 뒤 바뀐 파일만 다시 파싱
+        self.start_watch([folder], prime=False)
+
+    def start_watch(self, targets, prime):
+        self.stop_watch()
+        self.watcher = FileWatcher(targets)
+        if prime:
+            self.watcher.prime()
+        self.var_status.set("변경 감시 중: " + ", ".join(os.path.basename(target) for target in targets))
+        self.watch_id = self.after(WATCH_INTERVAL_MS, self.poll_watch)
+
+    def stop_watch(self):
+        if self.watch_id is not None:
+            self.after_cancel(self.watch_id)
+            self.watch_id = None
+        self.watcher = None
+
+    def poll_watch(self):
+        """
+        감시 중인 파일의 변경을 확인합니다. 다른 작업이 진행 중이면 다음 주기로 미룹니다.
+        """
+        self.watch_id = None
+        if self.watcher is None:
+            return
+        if self.job is None:
+            ready, removed = self.watcher.poll()
+            if getattr(self, 'file_path', None) in removed:
+                self.clear_all()
+                self.var_status.set(f"{os.path.basename(self.file_path)} 파일이 없어졌습니다.")
+            if ready:
+                self.start_job("변경 반영", ready, self.parse, on_file=self.on_watch_file)
+        self.watch_id = self.after(WATCH_INTERVAL_MS, self.poll_watch)
+
+    def on_watch_file(self, file_path, parsed_data, error, timer):
+        if error is not None:
+            # 감시 중에는 창을 띄우지 않고 상태 표시줄에만 알림 (단계 기록보다 나중에 표시)
+            self.after_idle(self.var_status.set, f"{os.path.basename(file_path)} 읽기 실패: {error}")
+            return
+        if file_path != getattr(self, 'file_path', None):
+            self.file_path = file_path
+            self.var_path.set(file_path)
+        self.update_parsed(parsed_data, timer)
     
     def export_to_excel(self):
         if not self.parsed_data:
             messagebox.showinfo("정보", "내보낼 데이터가 없습니다.")
             return
         
-        # DataFrame으로 변환
-        df = pd.DataFrame(self.parsed_data)
-        
         default_filename = "예산보고서.xlsx"  # 기본값(파일이 없는 경우 대비)
         if self.file_path:  # 파일 경로가 존재한다면
             original_filename = os.path.basename(self.file_path)  # 예: '테스트입니다.xlsx'
@@ -379,11 +3070,58 @@ class MyApp(tk.Tk):
             return
         
         try:
-            df.to_excel(file_path, index=False)
+            save_report_excel(file_path, self.parsed_data)
             messagebox.showinfo("성공", f"데이터를 성공적으로 '{file_path}'에 저장했습니다.")
         except Exception as e:
             messagebox.showerror("저장 오류", f"엑셀 파일로 저장하는 중 오류가 발생했습니다.\n{e}")
 
+    def export_report_text(self):
+        """
+        최종 보고서를 .txt 또는 Markdown(.md) 파일로 저장합니다. (확장자로 형식 결정)
+        """
+        if not self.parsed_data:
+            messagebox.showinfo("정보", "내보낼 데이터가 없습니다.")
+            return
+
+        default_filename = "예산보고서.txt"
+        source_path = getattr(self, 'file_path', None) or ""
+        if source_path:
+            filename_without_ext = os.path.splitext(os.path.basename(source_path))[0]
+            default_filename = f"예산보고서_{filename_without_ext}.txt"
+
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".txt",
+            initialfile=default_filename,
+            filetypes=REPORT_FILETYPES,
+            title="보고서 텍스트로 저장"
+        )
+        if not file_path:
+            return
+
+        try:
+            writer = ReportTextWriter(file_path, with_names=False)
+            try:
+                writer.append(source_path, self.parsed_data)
+            except BaseException:
+                writer.discard()
+                raise
+            writer.close()
+            messagebox.showinfo("성공", f"보고서를 성공적으로 '{file_path}'에 저장했습니다.")
+        except Exception as e:
+            messagebox.showerror("저장 오류", f"보고서 텍스트로 저장하는 중 오류가 발생했습니다.\n{e}")
+
+    def copy_report(self):
+        """
+        최종 보고서 텍스트("구분 | 내용 | 금액")를 클립보드에 복사합니다. (TEXT_BATCH 줄씩 나눠 넣음)
+        """
+        if not self.parsed_data:
+            messagebox.showinfo("정보", "복사할 데이터가 없습니다.")
+            return
+        self.clipboard_clear()
+        for idx, chunk in enumerate(iter_text_chunks(iter_report_lines(self.parsed_data), TEXT_BATCH)):
+            self.clipboard_append("\n" + chunk if idx else chunk)
+        self.var_status.set(f"보고서를 클립보드에 복사했습니다. (중분류 {len(self.parsed_data)}개)")
+
     def export_to_existing_excel(self):
         """
         기존 엑셀 파일에 '새 시트'를 만들어 데이터를 추가로 내보내기
@@ -396,36 +3134,106 @@ class MyApp(tk.Tk):
             messagebox.showinfo("정보", "먼저 엑셀 파일을 선택하세요.")
             return
 
-        # DataFrame 변환
-        df = pd.DataFrame(self.parsed_data)
+        sheet_name = REPORT_SHEET
+        parsed_data = self.parsed_data
+        added = {}
 
-        sheet_name = "예산보고서" # 시트 이름은 원하시는대로 지정해주시면 될 것 같습니다.
+        def work(file_path, timer):
+            # 같은 이름의 시트가 있으면 실제로는 예산보고서1 ... 로 추가됨
+            with measure(timer, "save"):
+                added[file_path] = append_report_sheet(file_path, parsed_data, sheet_name)
+            return parsed_data
+
+        def on_file(file_path, parsed_data, error, timer):
+            if error is not None:
+                messagebox.showerror("저장 오류", f"엑셀 파일에 새 시트를 추가하는 중 오류가 발생했습니다.\n{error}")
+            else:
+                messagebox.showinfo("성공", f"기존 파일 '{file_path}'에 시트 '{added[file_path]}'로 저장했습니다.")
 
         # 1) 기존 엑셀 파일 경로 선택
         existing_file = self.file_path  # 사용자가 이미 선택한 파일 경로
-        try:
-            with pd.ExcelWriter(existing_file, 
-                                engine="openpyxl", 
-                                mode="a", 
-                                if_sheet_exists="new") as writer:
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
-            messagebox.showinfo("성공", f"기존 파일 '{existing_file}'에 시트 '{sheet_name}'로 저장했습니다.")
-        except Exception as e:
-            messagebox.showerror("저장 오류", f"엑셀 파일에 새 시트를 추가하는 중 오류가 발생했습니다.\n{e}")
+        self.start_job("시트 추가", [existing_file], work, on_file=on_file)
     
     # 여러 파일을 선택하고 각 파일에 대해 시트를 추가하는 함수
     def process_multiple_files(self):
         # 파일 다이얼로그를 통해 여러 파일 선택
         file_paths = filedialog.askopenfilenames(title="작업할 파일들 선택", filetypes=[("Excel Files", "*.xlsx;*.xls")])
-    
-        for file_path in file_paths:
-            self.file_path = file_path
-            self.var_path.set(file_path)
-            self.parse_and_show(file_path)
+        if not file_paths:
+            return
+
+        # 파일별 상태를 기록해 두고, 같은 파일들로 중단된 작업이 있으면 완료된 파일을 건너뜀
+        # (같은 파일에 "예산보고서" 시트가 두 번 붙지 않도록)
+        try:
+            manifest = BatchManifest(default_manifest_path("append", file_paths), file_paths)
+            if manifest.resumable():
+                resume = messagebox.askyesno(
+                    "이어서 처리",
+                    f"같은 파일들로 중단된 작업이 있습니다. ({len(manifest.completed())}/{len(file_paths)}개 완료)\n"
+                    "완료된 파일은 건너뛰고 이어서 처리할까요?\n([아니요]를 누르면 모든 파일에 다시 시트를 추가합니다.)")
+                if not resume:
+                    manifest.reset()
+            manifest.save()
+        except OSError as e:
+            messagebox.showerror("오류", f"작업 기록을 만들 수 없습니다.\n{e}")
+            return
+        # 통합문서를 열어 시트 이름을 확인하는 일(check)은 읽기 단계에서 파일마다 함
+        remaining = manifest.remaining()
+        skipped = set()   # 이전 실행에서 시트를 붙인 뒤 기록 전에 종료된 파일
+
+        # 읽기(미리 읽기) → 파싱 → 시트 추가를 겹쳐 처리하고, 단계가 끝날 때마다 기록
+        def retrying(file_path):
+            job = self.job
+
+            def on_retry(error, delay):
+                # 작업 스레드에서 호출되므로 진행 표시줄에는 큐를 거쳐 보임
+                job.notify(f"{os.path.basename(file_path)} 파일이 잠겨 있어 {delay}초 후 다시 시도")
+                manifest.begin(file_path)
+            # 취소하면 잠긴 파일을 더 기다리지 않음
+            return {"wait": job.cancel_event.wait, "on_retry": on_retry}
+
+        def read(file_path, timer):
+            if manifest.check(file_path):
+                skipped.add(file_path)
+                return None
+            manifest.begin(file_path)
+            return retry_locked(self.prefetch, file_path, timer, **retrying(file_path))
 
-            #parsed_data = parse_excel(file_path)
-            #self.parsed_data = parsed_data  # 각 파일의 데이터를 self.parsed_data에 저장
-            self.export_to_existing_excel()  # 저장 함수 호출
+        def parse(file_path, timer, data):
+            if file_path in skipped:
+                return []
+            parsed_data = self.parse(file_path, timer, data)
+            manifest.mark(file_path, "parsed")
+            return parsed_data
+
+        def write(file_path, parsed_data, timer):
+            if file_path in skipped:
+                return
+            with measure(timer, "save"):
+                sheet = retry_locked(append_report_sheet, file_path, parsed_data, **retrying(file_path))
+            manifest.mark(file_path, "written", error=None, sheet=sheet,
+                          seconds=sum(record["seconds"] for record in timer.stages.values()))
+
+        last = {}
+
+        def on_file(file_path, parsed_data, error, timer):
+            if file_path in skipped:
+                return
+            if error is not None:
+                manifest.mark(file_path, "failed", error=error,
+                              seconds=sum(record["seconds"] for record in timer.stages.values()))
+                return
+            last["file"] = (file_path, parsed_data)
+
+        def on_done(job):
+            # 마지막으로 처리한 파일의 결과를 화면에 표시
+            if "file" in last:
+                file_path, parsed_data = last["file"]
+                self.file_path = file_path
+                self.var_path.set(file_path)
+                self.show_parsed(parsed_data)
+            self.job_summary(job, "시트 추가", manifest)
+
+        self.start_job("여러 엑셀에 시트 추가", remaining, parse, on_file=on_file, on_done=on_done, write=write, read=read)
     
         # 여러 엑셀 파일을 하나의 통합 파일로 저장하는 함수
     def process_multiple_files_2_one(self):
@@ -435,11 +3243,11 @@ class MyApp(tk.Tk):
         """
         default_filename = "통합예산보고서.xlsx"  # 기본값(파일이 없는 경우 대비)
 
-        # 통합 엑셀 파일 경로 설정 (새로 생성)
+        # 통합 파일 경로 설정 (새로 생성, .txt/.md 를 고르면 보고서 텍스트로 기록)
         output_file = filedialog.asksaveasfilename(
             defaultextension=".xlsx",
             initialfile=default_filename,  # 여기서 기본 파일명 설정
-            filetypes=[("Excel files", "*.xlsx *.xls")],
+            filetypes=[("Excel files", "*.xlsx *.xls")] + REPORT_FILETYPES,
             title="엑셀 파일로 내보내기"
         )
         if not output_file:
@@ -448,41 +3256,350 @@ class MyApp(tk.Tk):
         
         # 여러 파일을 선택
         file_paths = filedialog.askopenfilenames(title="파일 선택", filetypes=[("Excel Files", "*.xlsx;*.xls")])
+        if not file_paths:
+            return
+
+        # 새로운 엑셀 파일에 데이터를 추가 (각 파일은 파싱하는 즉시 기록, 저장은 마지막에 한 번)
+        # 기록기는 작업 스레드의 첫 기록 때 만들고, 취소되면 작업 스레드에서 버림 (임시 파일을 남기지 않음)
+        with_index = self.var_index.get()
+        writers = []
 
-        # 새로운 엑셀 파일에 데이터를 추가
-        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-            start_row = 0  # 첫 번째 파일부터 시작
-            for idx, file_path in enumerate(file_paths):
-                # 각 엑셀 파일 파싱
-                parsed_data = parse_excel(file_path)
+        def get_writer():
+            if not writers:
+                writers.append(open_report_writer(output_file, with_index))
+            return writers[0]
 
-                # 파일 이름을 삽입할 행 (파일 이름을 한 행으로 추가)
-                file_name = os.path.basename(file_path)
-                
-                # 파일 이름을 DataFrame으로 변환 (한 행 데이터로 추가)
-                file_name_row = pd.DataFrame([['파일 이름:', file_name]], columns=["구분", "내용"])
+        # 읽기(미리 읽기) → 파싱 → 통합 파일 기록을 겹쳐 처리 (기록은 한 스레드에서 입력 순서대로)
+        def write(file_path, parsed_data, timer):
+            with measure(timer, "save"):
+                get_writer().append(file_path, parsed_data)
 
-                # DataFrame 처리
-                df = pd.DataFrame(parsed_data)
+        def finish(timer):
+            # 통합 파일 마무리 저장도 따로 기록
+            with measure(timer, "save"):
+                get_writer().close()
 
-                # 엑셀에 삽입
-                file_name_row.to_excel(writer, index=False, header=False, startrow=start_row, sheet_name="통합데이터")
-                df.to_excel(writer, index=False, header=(start_row == 0), startrow=start_row + 1, sheet_name="통합데이터")
-                
-                # 파일을 저장한 후, 다음 데이터를 위한 행 이동
-                start_row += len(df) + 2  # 파일 이름을 위한 1행과 데이터 행을 포함한 크기만큼 증가
+        def abort():
+            if writers:
+                writers[0].discard()
 
-        messagebox.showinfo("성공", "여러 엑셀 파일이 통합되었습니다.")
+        def on_done(job):
+            if job.cancelled():
+                messagebox.showinfo("정보", "작업이 취소되어 통합 파일을 저장하지 않았습니다.")
+            elif any(not file_path for file_path, _ in job.errors):
+                self.job_summary(job, "통합")
+            else:
+                self.job_summary(job, "여러 엑셀 파일이 통합되었습니다")
 
+        self.start_job("통합", file_paths, self.parse, on_done=on_done, finish=finish, write=write, abort=abort)
 
-if __name__ == "__main__":
-    # pyperclip 설치 여부 확인
-    # 오류 발생 시, 클립보드 복사 기능이기에 사용안하시면 삭제해도 괜찮습니다.
+
+# ------------------ 명령줄(일괄 처리) ------------------ #
+def collect_files(inputs):
+    """
+    폴더 또는 glob 패턴 목록에서 처리할 엑셀 파일을 정렬된 순서로 모읍니다.
+    엑셀이 열어둔 임시 파일(~$...)은 제외합니다.
+    """
+    found = []
+    for target in inputs:
+        if os.path.isdir(target):
+            matches = glob.glob(os.path.join(target, "*.xlsx")) + glob.glob(os.path.join(target, "*.xls"))
+        else:
+            matches = glob.glob(target)
+        for path in matches:
+            if os.path.isfile(path) and not os.path.basename(path).startswith("~$"):
+                found.append(os.path.abspath(path))
+    return sorted(set(found))
+
+def batch_parse(file_path, parsed_data=None, engine="columnar", all_sheets=False):
+    """
+    작업 프로세스에서 파일 하나를 파싱합니다. (캐시된 결과가 있으면 그대로 사용)
+    (파일 경로, 파싱 결과, 소요 시간, 오류 메시지, 단계별 기록)을 반환합니다.
+    """
+    timer = StageTimer(file_path)
+    start = time.perf_counter()
     try:
-        import pyperclip
-    except ImportError:
-        messagebox.showerror("라이브러리 오류", "pyperclip 라이브러리가 설치되지 않았습니다.\n명령어: pip install pyperclip")
-        sys.exit(1) # 프로그램 종료 코드로 오류발생시 주석 처리 후 시도해보세요.
-    
+        if parsed_data is None:
+            parsed_data = parse_file(file_path, engine, timer, all_sheets)
+    except Exception as e:
+        return file_path, [], time.perf_counter() - start, str(e), timer.stages
+    return file_path, parsed_data, time.perf_counter() - start, None, timer.stages
+
+def batch_append(file_path, parsed_data=None, engine="columnar", all_sheets=False):
+    """
+    작업 프로세스에서 파일 하나를 파싱한 뒤 그 파일에 "예산보고서" 시트를 추가합니다.
+    엑셀이 열고 있어 잠긴 파일은 RETRY_DELAYS 간격으로 다시 시도합니다.
+    """
+    def on_retry(error, delay):
+        print(f"{os.path.basename(file_path)} 파일이 잠겨 있어 {delay}초 후 다시 시도합니다: {error}")
+
+    timer = StageTimer(file_path)
+    start = time.perf_counter()
+    try:
+        if parsed_data is None:
+            parsed_data = retry_locked(parse_file, file_path, engine, timer, all_sheets, on_retry=on_retry)
+        with timer.stage("save"):
+            retry_locked(append_report_sheet, file_path, parsed_data, on_retry=on_retry)
+    except Exception as e:
+        return file_path, [], time.perf_counter() - start, str(e), timer.stages
+    return file_path, parsed_data, time.perf_counter() - start, None, timer.stages
+
+def run_batch(file_paths, output_file=None, workers=None, engine="columnar", cache=None, with_index=False,
+              all_sheets=False, store=None, manifest=None):
+    """
+    여러 파일을 프로세스 풀로 나누어 처리합니다.
+    output_file 이 없으면 각 파일에 시트를 추가하고, 있으면 입력 순서대로 한 파일에 통합합니다.
+    cache 가 있으면 캐시된 파일은 엑셀을 읽지 않습니다.
+    store(ItemStore) 가 있으면 파일마다 파싱한 항목을 바로 기록합니다.
+    manifest(BatchManifest) 가 있으면 파일마다 결과를 받는 즉시 상태를 기록합니다.
+    workers 가 0 이면 프로세스 풀 없이 현재 프로세스에서 처리합니다. (프로파일링용)
+    실패한 파일 수를 반환합니다.
+    """
+    task = functools.partial(batch_parse if output_file else batch_append, engine=engine, all_sheets=all_sheets)
+    variant = SHEETS_VARIANT if all_sheets else ""
+    failed = 0
+    writer = open_report_writer(output_file, with_index) if output_file else None
+    start = time.perf_counter()
+
+    # 캐시 조회는 작업 프로세스에 보내기 전에 한 번에 처리
+    keys = {}
+    cached = {}
+    if cache is not None:
+        for file_path in file_paths:
+            try:
+                keys[file_path] = cache.key(file_path, variant)
+            except OSError:
+                continue
+            parsed_data = cache.load(keys[file_path])
+            if parsed_data is not None:
+                cached[file_path] = parsed_data
+
+    # map 은 입력 순서대로 결과를 돌려주므로 통합 순서가 항상 같습니다.
+    pool = ProcessPoolExecutor(max_workers=workers) if workers != 0 else None
+    mapper = pool.map if pool is not None else map
+    try:
+        results = mapper(task, file_paths, [cached.get(file_path) for file_path in file_paths])
+        for idx, (file_path, parsed_data, elapsed, error, stages) in enumerate(results, start=1):
+            name = os.path.basename(file_path)
+            # 작업 프로세스에서 잰 단계별 기록을 받아 이 프로세스에서 로그로 남김
+            timer = StageTimer(file_path)
+            timer.stages.update(stages)
+            if error is not None:
+                failed += 1
+                print(f"[{idx}/{len(file_paths)}] {name}  실패: {error}")
+                if manifest is not None:
+                    manifest.begin(file_path)
+                    manifest.mark(file_path, "failed", error=error, seconds=elapsed)
+                log_timing(timer)
+                continue
+            if manifest is not None:
+                manifest.begin(file_path)
+                manifest.mark(file_path, "written", error=None, seconds=elapsed)
+            mark = "  (캐시)" if file_path in cached else ""
+            print(f"[{idx}/{len(file_paths)}] {name}  {elapsed:.3f}s  중분류 {len(parsed_data)}개{mark}")
+            if file_path in keys and file_path not in cached and parsed_data:
+                if not cache.store(keys[file_path], parsed_data):
+                    print(f"    캐시에 저장하지 못했습니다: {name}")
+            if writer is not None:
+                with timer.stage("save"):
+                    writer.append(file_path, parsed_data)
+            if store is not None:
+                with timer.stage("store") as record:
+                    try:
+                        store.add(file_path, parsed_data, keys.get(file_path))
+                    except sqlite3.Error as e:
+                        # 파싱/기록은 끝났으므로 이 파일만 알리고 계속 처리
+                        record["error"] = str(e)
+                        print(f"    저장소에 기록하지 못했습니다: {name} ({e})")
+            if timer.stages:
+                print(f"    {timer.summary()}")
+            log_timing(timer)
+    except BaseException:
+        # 중단되면 통합 파일을 반쯤 쓴 채로 남기지 않음
+        if writer is not None:
+            writer.discard()
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if writer is not None:
+        timer = StageTimer(output_file)
+        with timer.stage("save"):
+            writer.close()
+        print(f"통합 파일 저장: {output_file}  {timer.stages['save']['seconds']:.3f}s")
+        log_timing(timer)
+
+    total = time.perf_counter() - start
+    rate = len(file_paths) / total if total > 0 else 0.0
+    print(f"총 {len(file_paths)}개 파일 (실패 {failed}개)  {total:.3f}s  {rate:.2f} files/s")
+    if cache is not None:
+        print(cache.stats())
+    if store is not None:
+        print(store.stats())
+    if manifest is not None:
+        print_manifest(manifest)
+    return failed
+
+def print_manifest(manifest):
+    """
+    작업 기록의 상태별 파일 수와 실패한 파일 표를 출력합니다.
+    """
+    counts = manifest.counts()
+    print("작업 기록: " + ", ".join(f"{MANIFEST_STATES[state]} {count}개" for state, count in counts.items() if count)
+          + f"  ({manifest.path})")
+    failed_rows = [row for row in manifest.rows() if row[1] == MANIFEST_STATES["failed"]]
+    if failed_rows:
+        print("파일 | 상태 | 시도 | 시간 | 오류")
+        for row in failed_rows:
+            print(" | ".join(str(value) for value in row))
+
+def print_totals(store, by, limit=None, **filters):
+    """
+    항목 저장소의 합계를 표 형태로 출력합니다.
+    """
+    rows = store.totals(by, limit=limit, **filters)
+    print(" | ".join(store.columns(by)))
+    for row in rows:
+        *groups, count, files, amount = row
+        values = ["" if value is None else str(value) for value in groups]
+        print(" | ".join(values + [f"{count:,}", f"{files:,}", add_commas(amount)]))
+    print(f"{len(rows)}개 행")
+
+def process_inputs(args, store=None):
+    """
+    입력 파일을 일괄 처리하고 실패한 파일 수를 반환합니다. 처리할 파일이 없으면 None 을 반환합니다.
+    """
+    file_paths = collect_files(args.inputs)
+    if not file_paths:
+        print("처리할 엑셀 파일이 없습니다.")
+        return None
+    if args.output:
+        # 출력 파일이 입력 패턴에 걸린 경우 제외
+        output_path = os.path.abspath(args.output)
+        file_paths = [path for path in file_paths if path != output_path]
+
+    cache = None
+    if not args.no_cache:
+        cache = ParseCache(args.cache_dir, args.cache_size * 1024 * 1024)
+
+    # 각 파일에 시트를 추가할 때는 파일별 상태를 기록해 중단된 작업을 이어서 처리
+    manifest = None
+    if not args.output:
+        manifest = BatchManifest(args.manifest or default_manifest_path("append", file_paths), file_paths)
+        if args.restart:
+            manifest.reset()
+        total = len(file_paths)
+        file_paths = manifest.prepare()
+        if len(file_paths) < total:
+            print(f"이전 작업에서 {total - len(file_paths)}개 파일을 이미 처리했습니다. "
+                  f"나머지 {len(file_paths)}개만 처리합니다. (처음부터: --restart)")
+
+    if args.profile:
+        # 작업 프로세스 안의 호출은 잡히지 않으므로 현재 프로세스에서 처리
+        profile = cProfile.Profile()
+        failed = profile.runcall(run_batch, file_paths, args.output, 0, args.engine, cache, args.index,
+                                 args.all_sheets, store, manifest)
+        profile.dump_stats(args.profile)
+        print(f"프로파일 저장: {args.profile}")
+    else:
+        failed = run_batch(file_paths, args.output, args.workers, args.engine, cache, args.index, args.all_sheets,
+                           store, manifest)
+    return failed
+
+# 이 인자가 있을 때만 창 없이 명령줄로 일괄 처리합니다.
+BATCH_FLAG = "--batch"
+
+def batch_arguments(argv):
+    """
+    명령줄 일괄 처리에 넘길 인자를 반환합니다. BATCH_FLAG 가 없으면 None 이며 창을 띄웁니다.
+    창 모드 EXE 로 엑셀 파일을 열거나 끌어다 놓아도 인자가 붙으므로, 인자만으로 파일을 고치지 않습니다.
+    """
+    if BATCH_FLAG not in argv:
+        return None
+    return [arg for arg in argv if arg != BATCH_FLAG]
+
+def main(argv=None):
+    """
+    명령줄 진입점입니다. 예)
+      python KISDI_Budget.py --batch 부서폴더                       → 각 파일에 "예산보고서" 시트 추가
+      python KISDI_Budget.py --batch "부서폴더/*.xlsx" -o 통합.xlsx  → 한 파일로 통합
+      python KISDI_Budget.py --batch 부서폴더 -o 통합.xlsx --store   → 통합하면서 항목을 저장소에 기록
+      python KISDI_Budget.py --batch --query category --item 인쇄    → 저장소에서 "인쇄" 항목의 중분류별 합계
+    """
+    parser = argparse.ArgumentParser(prog=f"KISDI_Budget.py {BATCH_FLAG}", description="예산 보고서 일괄 추출기")
+    parser.add_argument("inputs", nargs="*", help="엑셀 파일이 있는 폴더 또는 glob 패턴")
+    parser.add_argument("-o", "--output", help="통합 파일 경로 (.xlsx 또는 보고서 텍스트 .txt/.md, 지정하지 않으면 각 파일에 시트 추가)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="작업 프로세스 수 (기본값: CPU 개수, 0 이면 프로세스 풀 없이 처리)")
+    parser.add_argument("--engine", choices=["columnar", "stream", "rows"], default="columnar",
+                        help="파싱 방식 (stream 은 필요한 열만 한 행씩 읽어 메모리를 적게 씀)")
+    parser.add_argument("--all-sheets", action="store_true",
+                        help="첫 시트만이 아니라 예산 배치(B, D~L열)인 모든 시트를 파싱 (통합 파일에는 시트별 블록)")
+    parser.add_argument("--index", action="store_true", help="통합 파일에 파일별 행 위치를 적은 \"파일목록\" 시트 추가")
+    parser.add_argument("--no-cache", action="store_true", help="파싱 캐시를 사용하지 않음")
+    parser.add_argument("--cache-dir", default=None, help="파싱 캐시 폴더 (기본값: 사용자 로컬 폴더)")
+    parser.add_argument("--cache-size", type=int, default=CACHE_MAX_BYTES // (1024 * 1024),
+                        help="파싱 캐시 최대 크기(MB), 넘으면 오래 쓰지 않은 항목부터 삭제")
+    parser.add_argument("--manifest", metavar="PATH",
+                        help="파일별 처리 상태를 기록할 JSON 경로 (기본값: 사용자 로컬 폴더, 시트 추가 작업만)")
+    parser.add_argument("--restart", action="store_true",
+                        help="중단된 작업 기록을 무시하고 모든 파일에 다시 시트를 추가")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="cProfile 결과를 PATH 에 저장 (작업 프로세스 없이 처리, python -m pstats PATH 로 확인)")
+    store_group = parser.add_argument_group("항목 저장소")
+    store_group.add_argument("--store", nargs="?", const="", default=None, metavar="PATH",
+                             help="파싱한 항목을 SQLite 저장소에 기록 (PATH 생략 시 사용자 로컬 폴더의 items.sqlite)")
+    store_group.add_argument("--query", metavar="BY",
+                             help="저장소 합계를 출력 (기준: category, name, file, sheet 를 쉼표로 조합, 예: category,name)")
+    store_group.add_argument("--rollup", metavar="PATH", help="저장소의 중분류별/항목별/파일별 합계를 엑셀로 저장")
+    store_group.add_argument("--category", help="중분류 이름에 이 글자가 들어간 항목만 합계")
+    store_group.add_argument("--item", help="항목 이름에 이 글자가 들어간 항목만 합계")
+    store_group.add_argument("--file", help="파일 이름에 이 글자가 들어간 항목만 합계")
+    store_group.add_argument("--limit", type=int, default=None, help="--query 로 출력할 최대 행 수")
+    args = parser.parse_args(argv)
+
+    by = None
+    if args.query:
+        by = tuple(key.strip() for key in args.query.split(","))
+        unknown = [key for key in by if key not in STORE_GROUPS]
+        if unknown:
+            parser.error(f"알 수 없는 합계 기준: {', '.join(unknown)} (가능: {', '.join(STORE_GROUPS)})")
+    if not args.inputs and not (args.query or args.rollup):
+        parser.error("엑셀 파일 경로 또는 --query/--rollup 이 필요합니다.")
+
+    store = None
+    if args.store is not None or args.query or args.rollup:
+        store = ItemStore(args.store or None)
+
+    try:
+        failed = 0
+        if args.inputs:
+            failed = process_inputs(args, store if args.store is not None else None)
+            if failed is None:
+                return 1
+
+        filters = {"category": args.category, "name": args.item, "file": args.file}
+        if by:
+            print_totals(store, by, args.limit, **filters)
+        if args.rollup:
+            store.export_rollup(args.rollup, **filters)
+            print(f"저장소 합계 저장: {args.rollup}")
+    finally:
+        if store is not None:
+            store.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    # PyInstaller 로 만든 exe 에서 프로세스 풀을 쓰기 위해 필요
+    multiprocessing.freeze_support()
+
+    # --batch 가 있을 때만 GUI 없이 명령줄로 일괄 처리 (그 밖의 인자는 무시하고 창을 띄움)
+    batch_argv = batch_arguments(sys.argv[1:])
+    if batch_argv is not None:
+        sys.exit(main(batch_argv))
+
+    # 창을 바로 띄우고 pandas/openpyxl 은 창이 뜬 뒤에 불러옵니다.
     app = MyApp()
     app.mainloop()
\ No newline at end of file
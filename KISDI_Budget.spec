@@ -1,12 +1,15 @@
 # -*- mode: python ; coding: utf-8 -*-
 
 added_files = [ ("./CBNU.ico", '.')]
+# KISDI_Budget.py 는 무거운 모듈을 LazyModule 로 나중에 불러오므로 분석기가 찾지 못함
+hiddenimports = ['numpy', 'pandas', 'openpyxl', 'openpyxl.utils', 'xml.sax.saxutils', 'logging.handlers']
+
 a = Analysis(
     ['KISDI_Budget.py'],
     pathex=['C:\\CBNU_SOFT\\KISDI_BudgetManager'],
     binaries=[],
     datas=added_files,
-    hiddenimports=[],
+    hiddenimports=hiddenimports,
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,75 @@
+# -*- mode: python ; coding: utf-8 -*-
+# 빠른 시작용 빌드 (pyinstaller KISDI_Budget_onedir.spec)
+# - onedir: 실행할 때마다 임시 폴더에 압축을 풀지 않음 (dist/KISDI_Budget 폴더째 배포)
+# - UPX 미사용: DLL 을 풀어내는 시간이 없고 백신 검사도 빨라짐
+# - 쓰지 않는 pandas/NumPy 하위 모듈과 선택 의존성 제외
+
+added_files = [ ("./CBNU.ico", '.')]
+
+# import pandas 에 필요하지 않은 모듈만 제외합니다. (pandas.plotting, numpy.testing 은 import 시 필요)
+excludes = [
+    'pandas.tests',
+    'pandas.io.formats.style',
+    'numpy.tests',
+    'numpy.f2py',
+    'numpy.distutils',
+    'matplotlib',
+    'scipy',
+    'IPython',
+    'jinja2',
+    'pyarrow',
+    'numexpr',
+    'bottleneck',
+    'sqlalchemy',
+    'tables',
+    'lxml',
+    'pytest',
+    'tkinter.test',
+]
+
+# KISDI_Budget.py 는 무거운 모듈을 LazyModule 로 나중에 불러오므로 분석기가 찾지 못함
+hiddenimports = ['numpy', 'pandas', 'openpyxl', 'openpyxl.utils', 'xml.sax.saxutils', 'logging.handlers']
+
+a = Analysis(
+    ['KISDI_Budget.py'],
+    pathex=['C:\\CBNU_SOFT\\KISDI_BudgetManager'],
+    binaries=[],
+    datas=added_files,
+    hiddenimports=hiddenimports,
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=excludes,
+    noarchive=False,
+    optimize=0,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='KISDI_Budget',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon='./CBNU.ico'
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='KISDI_Budget',
+)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 저장소 최상위의 KISDI_Budget.py, KISDI_Benchmark.py 를 import 할 수 있도록 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,148 @@
+# 작업 기록(이어서 처리)과 잠긴 파일 재시도: 완료된 파일을 건너뛰고, 기록 전에 종료된 파일에 시트를 두 번 붙이지 않는지 확인합니다.
+import json
+
+import openpyxl
+import pytest
+
+import KISDI_Budget as kb
+from test_parse_parity import EDGE_CASES, write_rows
+
+
+@pytest.fixture
+def files(tmp_path):
+    return [write_rows(str(tmp_path / f"book{idx}.xlsx"), EDGE_CASES["leading_dash"]) for idx in range(3)]
+
+
+@pytest.fixture
+def manifest_path(tmp_path):
+    return str(tmp_path / "jobs" / "append.json")
+
+
+def test_resume_skips_written_files(files, manifest_path):
+    manifest = kb.BatchManifest(manifest_path, files)
+    assert not manifest.resumable()
+    assert manifest.prepare() == files
+    manifest.begin(files[0])
+    manifest.mark(files[0], "written", error=None, sheet="예산보고서", seconds=0.5)
+    manifest.begin(files[1])
+    manifest.mark(files[1], "failed", error="잠김", seconds=0.1)
+
+    resumed = kb.BatchManifest(manifest_path, files)
+    assert resumed.run == 2
+    assert resumed.resumable()
+    assert resumed.completed() == [files[0]]
+    assert resumed.remaining() == files[1:]
+    assert resumed.prepare() == files[1:]
+    rows = resumed.rows()
+    assert rows[0][1] == kb.MANIFEST_STATES["failed"] and rows[0][4] == "잠김"
+    assert ("book0.xlsx", "완료 (이전 실행)", 1, "0.50s", "") in rows
+
+
+def test_reset_and_complete_start_over(files, manifest_path):
+    manifest = kb.BatchManifest(manifest_path, files)
+    manifest.prepare()
+    manifest.mark(files[0], "written")
+
+    resumed = kb.BatchManifest(manifest_path, files)
+    resumed.reset()
+    assert resumed.prepare() == files
+    assert resumed.counts()["pending"] == 3
+
+    for file_path in files:
+        resumed.mark(file_path, "written")
+    with open(manifest_path, encoding="utf-8") as f:
+        assert json.load(f)["complete"]
+    # 모두 끝난 기록은 같은 파일들로 다시 시작하면 처음부터
+    again = kb.BatchManifest(manifest_path, files)
+    assert again.run == 1 and again.remaining() == files
+
+
+def test_check_finds_sheet_added_before_manifest_was_saved(files, manifest_path):
+    manifest = kb.BatchManifest(manifest_path, files)
+    assert manifest.check(files[0]) is False
+    assert manifest.files[files[0]]["sheets"] == ["Sheet"]
+    manifest.begin(files[0])
+    # 시트를 붙인 직후, 완료로 기록하기 전에 종료된 경우
+    kb.append_report_sheet(files[0], kb.parse_file(files[0]))
+
+    resumed = kb.BatchManifest(manifest_path, files)
+    assert resumed.remaining() == files
+    assert resumed.check(files[0]) is True
+    assert resumed.files[files[0]]["state"] == "written"
+    assert resumed.files[files[0]]["sheet"] == "예산보고서"
+    # check 는 바로 저장하므로 다시 열어도 완료로 남음
+    assert kb.BatchManifest(manifest_path, files).remaining() == files[1:]
+    assert openpyxl.load_workbook(files[0]).sheetnames == ["Sheet", "예산보고서"]
+
+
+def test_prepare_checks_every_remaining_file(files, manifest_path):
+    manifest = kb.BatchManifest(manifest_path, files)
+    manifest.prepare()
+    kb.append_report_sheet(files[2], kb.parse_file(files[2]))
+
+    resumed = kb.BatchManifest(manifest_path, files)
+    assert resumed.prepare() == files[:2]
+    assert resumed.counts() == {"pending": 2, "parsed": 0, "written": 1, "failed": 0}
+
+
+# ------------------ retry_locked ------------------ #
+def locked_then(result, failures):
+    calls = []
+
+    def func(*args):
+        calls.append(args)
+        if len(calls) <= failures:
+            raise PermissionError(13, "다른 프로그램이 사용 중")
+        return result
+    return func, calls
+
+
+def test_retry_locked_waits_between_attempts():
+    func, calls = locked_then("ok", 2)
+    waits, retries = [], []
+    result = kb.retry_locked(func, "a", delays=(1, 2, 4), wait=lambda delay: waits.append(delay),
+                             on_retry=lambda error, delay: retries.append(delay))
+    assert result == "ok"
+    assert calls == [("a",)] * 3
+    assert waits == retries == [1, 2]
+
+
+def test_retry_locked_stops_when_cancelled():
+    func, calls = locked_then("ok", 5)
+    waits = []
+
+    def cancelled(delay):
+        waits.append(delay)
+        return True
+
+    with pytest.raises(PermissionError):
+        kb.retry_locked(func, delays=(1, 2, 4), wait=cancelled)
+    assert len(calls) == 1 and waits == [1]
+
+
+def test_retry_locked_gives_up_after_last_delay():
+    func, calls = locked_then("ok", 5)
+    with pytest.raises(PermissionError):
+        kb.retry_locked(func, delays=(1, 2), wait=lambda delay: False)
+    assert len(calls) == 3
+
+
+def test_retry_locked_raises_other_errors_at_once():
+    calls = []
+
+    def missing():
+        calls.append(1)
+        raise FileNotFoundError("없음")
+
+    with pytest.raises(FileNotFoundError):
+        kb.retry_locked(missing, wait=lambda delay: pytest.fail("기다리지 않아야 함"))
+    assert calls == [1]
+
+
+def test_retry_notice_shows_in_progress_text():
+    job = kb.BackgroundJob("시트 추가", ["a.xlsx", "b.xlsx"], lambda file_path, timer: [])
+    job.started = 0
+    job.notify("a.xlsx 파일이 잠겨 있어 1초 후 다시 시도")
+    assert list(job.messages()) == [("notice", "a.xlsx 파일이 잠겨 있어 1초 후 다시 시도")]
+    job.notice = "a.xlsx 파일이 잠겨 있어 1초 후 다시 시도"
+    assert job.progress_text().endswith(" | a.xlsx 파일이 잠겨 있어 1초 후 다시 시도")
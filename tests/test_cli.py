@@ -0,0 +1,32 @@
+# 명령줄: --batch 가 있을 때만 창 없이 일괄 처리하는지 확인합니다.
+import os
+import subprocess
+import sys
+
+import pytest
+
+import KISDI_Budget as kb
+from test_parse_parity import EDGE_CASES, write_rows
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "KISDI_Budget.py")
+
+
+@pytest.mark.parametrize("argv", [[], ["book.xlsx"], ["폴더", "-o", "통합.xlsx"]])
+def test_arguments_without_batch_flag_open_the_window(argv):
+    assert kb.batch_arguments(argv) is None
+
+
+def test_batch_flag_is_removed_from_cli_arguments():
+    assert kb.batch_arguments(["--batch", "폴더", "-o", "통합.md"]) == ["폴더", "-o", "통합.md"]
+    assert kb.batch_arguments(["폴더", "--batch"]) == ["폴더"]
+
+
+def test_batch_run_writes_consolidated_report(tmp_path):
+    file_path = write_rows(str(tmp_path / "book.xlsx"), EDGE_CASES["empty_amounts"])
+    output_file = str(tmp_path / "out.txt")
+    env = dict(os.environ, LOCALAPPDATA=str(tmp_path / "appdata"))
+    result = subprocess.run([sys.executable, SCRIPT, "--batch", file_path, "-o", output_file, "-j", "0", "--no-cache"],
+                            capture_output=True, text=True, env=env, timeout=120)
+    assert result.returncode == 0, result.stderr
+    with open(output_file, encoding="utf-8") as f:
+        assert f.read().startswith("파일 이름: book.xlsx")
@@ -0,0 +1,115 @@
+# 보고서 시트를 openpyxl/pandas 가 읽을 수 있고, 반복해서 넣어도 이름/서식이 맞는지, 금액 칸에 #,##0 서식이 붙는지 확인합니다.
+import re
+import zipfile
+
+import openpyxl
+import pandas as pd
+import pytest
+
+import KISDI_Budget as kb
+from test_parse_parity import EDGE_CASES, write_rows
+
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+
+def prefix_namespace(xml):
+    """
+    기본 네임스페이스로 쓴 SpreadsheetML 을 "x:" 접두사를 붙인 형태로 바꿉니다. (다른 프로그램이 만든 파일 흉내)
+    """
+    xml = xml.replace(f'xmlns="{NS_MAIN}"', f'xmlns:x="{NS_MAIN}"')
+    return re.sub(r"<(/?)(?!\w+:)(\w+)", r"<\1x:\2", xml)
+
+
+def make_prefixed(src_path, dst_path):
+    with zipfile.ZipFile(src_path) as src, zipfile.ZipFile(dst_path, "w", zipfile.ZIP_DEFLATED) as dst:
+        for info in src.infolist():
+            data = src.read(info)
+            if info.filename.startswith("xl/") and info.filename.endswith(".xml"):
+                data = prefix_namespace(data.decode("utf-8")).encode("utf-8")
+            dst.writestr(info, data)
+    return dst_path
+
+
+def cell_xf_count(file_path):
+    with zipfile.ZipFile(file_path) as src:
+        styles = src.read("xl/styles.xml").decode("utf-8")
+    cell_xfs = re.search(r"<(?:\w+:)?cellXfs\b[^>]*>(.*?)</(?:\w+:)?cellXfs>", styles, re.S).group(1)
+    return len(re.findall(r"<(?:\w+:)?xf\b", cell_xfs))
+
+
+@pytest.fixture(params=["plain", "prefixed"])
+def workbook(tmp_path, request):
+    file_path = write_rows(str(tmp_path / "book.xlsx"), EDGE_CASES["dash_across_categories"])
+    if request.param == "prefixed":
+        file_path = make_prefixed(file_path, str(tmp_path / "prefixed.xlsx"))
+        assert "<x:sheets>" in zipfile.ZipFile(file_path).read("xl/workbook.xml").decode("utf-8")
+    return file_path
+
+
+def test_repeated_injections_are_readable(workbook):
+    parsed_data = kb.parse_file(workbook)
+    original = openpyxl.load_workbook(workbook).sheetnames
+
+    names = [kb.inject_report_sheet(workbook, parsed_data) for _ in range(3)]
+    assert names == ["예산보고서", "예산보고서1", "예산보고서2"]
+
+    book = openpyxl.load_workbook(workbook)
+    assert book.sheetnames == original + names
+    expected = [kb.report_columns(parsed_data)] + kb.report_values(parsed_data)
+    for name in names:
+        sheet = book[name]
+        assert [list(row) for row in sheet.iter_rows(values_only=True)] == expected
+        assert all(row[-1].number_format == kb.AMOUNT_FORMAT for row in sheet.iter_rows(min_row=2))
+
+    frames = pd.read_excel(workbook, sheet_name=None, header=None)
+    assert list(frames) == original + names
+    assert frames["예산보고서2"].iloc[1:, -1].tolist() == [row[-1] for row in expected[1:]]
+    # 원본 시트는 그대로 다시 파싱됨
+    assert kb.parse_file(workbook) == parsed_data
+
+
+def test_number_style_is_added_once(workbook):
+    parsed_data = kb.parse_file(workbook)
+    before = cell_xf_count(workbook)
+    kb.inject_report_sheet(workbook, parsed_data)
+    after_first = cell_xf_count(workbook)
+    kb.inject_report_sheet(workbook, parsed_data)
+    assert after_first <= before + 1
+    assert cell_xf_count(workbook) == after_first
+
+
+def test_add_number_style_reuses_plain_xf():
+    styles = ('<styleSheet><cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+              '<xf numFmtId="3" fontId="1" fillId="0" borderId="0" xfId="0"/>'
+              '<xf numFmtId="3" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs></styleSheet>')
+    assert kb.add_number_style(styles) == (styles, 2)
+    bold_only = styles.replace('<xf numFmtId="3" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>', "")
+    added, style = kb.add_number_style(bold_only)
+    assert style == 2
+    assert 'count="3"' in added and added.count('numFmtId="3"') == 2
+
+
+def test_openpyxl_fallback_formats_amounts(tmp_path, monkeypatch):
+    file_path = write_rows(str(tmp_path / "book.xlsx"), EDGE_CASES["dash_across_categories"])
+    parsed_data = kb.parse_file(file_path)
+
+    def unexpected(*args):
+        raise ValueError("예상과 다른 구조")
+
+    monkeypatch.setattr(kb, "inject_report_sheet", unexpected)
+    assert kb.append_report_sheet(file_path, parsed_data) == "예산보고서"
+    sheet = openpyxl.load_workbook(file_path)["예산보고서"]
+    assert all(row[-1].number_format == kb.AMOUNT_FORMAT for row in sheet.iter_rows(min_row=2))
+
+
+def test_save_report_excel_formats_amounts(tmp_path):
+    file_path = write_rows(str(tmp_path / "book.xlsx"), EDGE_CASES["numeric_b_cells"])
+    parsed_data = kb.parse_file(file_path)
+    output_file = str(tmp_path / "report.xlsx")
+    assert kb.save_report_excel(output_file, parsed_data) == "Sheet1"
+
+    book = openpyxl.load_workbook(output_file)
+    assert book.sheetnames == ["Sheet1"]
+    rows = list(book["Sheet1"].iter_rows())
+    assert [[cell.value for cell in row] for row in rows] == [kb.report_columns(parsed_data)] + kb.report_values(parsed_data)
+    assert all(row[-1].number_format == kb.AMOUNT_FORMAT for row in rows[1:])
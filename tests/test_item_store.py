@@ -0,0 +1,54 @@
+# 항목 저장소: 단위 열은 문자열로 기록되고, 기록 실패는 파일 단위로만 알려지는지 확인합니다.
+import sqlite3
+
+import pytest
+
+import KISDI_Budget as kb
+from test_parse_parity import EDGE_CASES, write_rows
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = kb.ItemStore(str(tmp_path / "items.sqlite"))
+    yield store
+    store.close()
+
+
+@pytest.mark.parametrize("case", ["date_units", "numeric_b_cells"])
+def test_units_are_stored_as_report_text(tmp_path, store, case):
+    file_path = write_rows(str(tmp_path / f"{case}.xlsx"), EDGE_CASES[case])
+    parsed_data = kb.parse_file(file_path)
+    assert store.add(file_path, parsed_data)
+
+    rows = store.db.execute("SELECT qty_unit, freq1_unit, freq2_unit FROM items ORDER BY rowid").fetchall()
+    expected = [
+        tuple(None if unit is None else str(unit) for unit in units)
+        for category in parsed_data
+        for units in zip(category.qty_units, category.freq1_units, category.freq2_units)
+    ]
+    assert rows == expected
+    assert all(unit is None or isinstance(unit, str) for row in rows for unit in row)
+
+
+def test_run_batch_continues_after_store_error(tmp_path, store, monkeypatch, capsys):
+    file_paths = [write_rows(str(tmp_path / f"{case}.xlsx"), EDGE_CASES[case])
+                  for case in ("date_units", "empty_amounts")]
+    output_file = str(tmp_path / "out.txt")
+    added = []
+
+    def add(file_path, parsed_data, digest=None):
+        if not added:
+            added.append(None)
+            raise sqlite3.OperationalError("database is locked")
+        added.append(file_path)
+        return True
+
+    monkeypatch.setattr(store, "add", add)
+    monkeypatch.setattr(kb, "log_timing", lambda timer: None)
+    failed = kb.run_batch(file_paths, output_file, workers=0, store=store)
+
+    assert failed == 0
+    assert added == [None, file_paths[1]]
+    assert "저장소에 기록하지 못했습니다: date_units.xlsx" in capsys.readouterr().out
+    with open(output_file, encoding="utf-8") as f:
+        assert f.read().count("파일 이름:") == 2
@@ -0,0 +1,13 @@
+# 지연 불러오기: 처음 읽은 속성은 인스턴스에 남아 다음부터는 모듈을 다시 찾지 않는지 확인합니다.
+import KISDI_Budget as kb
+
+
+def test_attribute_is_cached_after_first_lookup(monkeypatch):
+    module = kb.LazyModule("json")
+    assert module.dumps([1]) == "[1]"
+    assert module.__dict__["dumps"] is module.load().dumps
+
+    calls = []
+    monkeypatch.setattr(module, "load", lambda: calls.append("load"))
+    assert module.dumps({}) == "{}"
+    assert calls == []
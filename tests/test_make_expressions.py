@@ -0,0 +1,95 @@
+# make_expressions(열 단위)가 make_expression(행 단위)과 같은 문자열을 만드는지 확인합니다.
+import numpy as np
+import pandas as pd
+import pytest
+
+import KISDI_Budget as kb
+
+NAN = float("nan")
+COLUMNS = ["name", "unit_price", "qty", "qty_unit", "freq1", "freq1_unit", "freq2", "freq2_unit", "amount"]
+
+
+def check(rows, dtypes=None):
+    """
+    rows 의 각 행을 make_expression 으로, 열들을 make_expressions 로 만들어 비교합니다.
+    dtypes 로 열 형식을 지정할 수 있습니다. (지정하지 않으면 pandas 가 고름)
+    """
+    frame = pd.DataFrame(rows, columns=COLUMNS)
+    for column, dtype in (dtypes or {}).items():
+        frame[column] = frame[column].astype(dtype)
+    expected = [kb.make_expression(*row) for row in frame.itertuples(index=False, name=None)]
+    assert kb.make_expressions(*(frame[column] for column in COLUMNS)) == expected
+
+
+def test_nan_values():
+    check([
+        ["a", NAN, NAN, NAN, NAN, NAN, NAN, NAN, 100],
+        ["b", 1000, NAN, "명", NAN, "월", NAN, "회", 200],
+        ["c", NAN, 2, NAN, 3, NAN, 4, NAN, 300],
+    ])
+
+
+def test_zero_and_negative_zero():
+    check([
+        ["a", 0, 0, "명", 0.0, "월", -0.0, "회", 100],
+        ["b", -0.0, -0.0, NAN, 0, NAN, 1, NAN, 200],
+        ["c", 0.0, 2, "명", -0.0, "월", 0, NAN, -300],
+    ])
+
+
+def test_int64_columns():
+    rows = [
+        ["a", 1000, 2, "명", 3, "월", 1, "회", 6000],
+        ["b", 1500, 0, NAN, 12, NAN, 0, NAN, 18000],
+        ["c", 20000, 10, "명", 1, "월", 3, NAN, 600000],
+    ]
+    check(rows, {column: "int64" for column in ["unit_price", "qty", "freq1", "freq2", "amount"]})
+
+
+def test_fractional_values():
+    check([
+        ["a", 1500.5, 2.5, "명", 1.5, "월", 0.25, "회", 1406.71875],
+        ["b", 0.1, 2.5, NAN, 3.75, NAN, 1.0, NAN, 9999.99],
+        ["c", 12345.678, 1.0, "명", 2.0, "월", NAN, NAN, 0.5],
+    ])
+
+
+def test_large_values():
+    check([
+        ["a", 123456789012, 3, "명", 1000000, "월", 7, "회", 9_007_199_254_740_993],
+        ["b", 1e15, 1e6, NAN, 2.5e9, NAN, NAN, NAN, 1e18],
+        ["c", 2 ** 53 + 1.0, 12, "명", 1e12, "월", 3, NAN, -1e17],
+    ])
+
+
+def test_units():
+    # 숫자 단위, 빈 문자열 단위, 없는 단위(NaN/None)
+    check([
+        ["a", 1000, 2, 3, 4, 5.5, 6, 0, 100],
+        ["b", 1000, 2, "", 4, "", 6, "", 200],
+        ["c", 1000, 2, None, 4, None, 6, None, 300],
+        ["d", 1000, 2, "명", 4, NAN, 6, "회", 400],
+    ])
+
+
+def test_booleans():
+    check([
+        ["a", True, True, "명", False, "월", True, NAN, 100],
+        ["b", 1000, 2, True, 3, False, 4, NAN, True],
+        ["c", 1, 1, "명", 1, "월", 1, NAN, 1],
+    ])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_mix(seed):
+    rnd = np.random.default_rng(seed)
+    values = [NAN, 0, -0.0, 1, 2.5, 1500.5, 1e12, 12, 3]
+    units = [NAN, None, "명", "월", "", 3]
+    rows = [
+        [f"항목{idx}"] + [
+            units[rnd.integers(len(units))] if column.endswith("unit") else values[rnd.integers(len(values))]
+            for column in COLUMNS[1:-1]
+        ] + [values[rnd.integers(1, len(values))] or 1]
+        for idx in range(200)
+    ]
+    check(rows)
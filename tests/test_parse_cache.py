@@ -0,0 +1,41 @@
+# 파싱 캐시: 저장 실패 시 임시 파일을 남기지 않고, 적중/미적중 횟수를 작업 단위로 셀 수 있는지 확인합니다.
+import datetime
+import os
+
+import pytest
+
+import KISDI_Budget as kb
+from test_parse_parity import EDGE_CASES, write_rows
+
+
+def test_write_json_atomic_removes_temp_file_on_error(tmp_path):
+    path = str(tmp_path / "entry.json")
+    with pytest.raises(TypeError):
+        kb.write_json_atomic(path, [datetime.datetime(2024, 1, 1)])
+    assert os.listdir(tmp_path) == []
+
+
+def test_stats_since_counts(tmp_path):
+    file_path = write_rows(str(tmp_path / "book.xlsx"), EDGE_CASES["empty_amounts"])
+    cache = kb.ParseCache(str(tmp_path / "cache"))
+    cache.parse(file_path, kb.parse_file)
+    start = cache.counts()
+    cache.parse(file_path, kb.parse_file)
+    cache.parse(file_path, kb.parse_file)
+    assert cache.stats(start) == "캐시 적중 2회 / 미적중 0회"
+    assert cache.stats() == "캐시 적중 2회 / 미적중 1회"
+
+
+def test_prefetched_stat_is_recorded_with_its_content(tmp_path):
+    # 미리 읽은 뒤 파싱 전에 파일이 저장되면, 새 파일을 옛 내용의 해시로 기억하지 않아야 함
+    file_path = write_rows(str(tmp_path / "book.xlsx"), EDGE_CASES["empty_amounts"])
+    cache = kb.ParseCache(str(tmp_path / "cache"))
+    data, stat = kb.read_file_bytes(file_path)
+
+    write_rows(file_path, EDGE_CASES["leading_dash"])
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    old_key = cache.key(file_path, "", data, stat)
+
+    new_data, _ = kb.read_file_bytes(file_path)
+    assert old_key != cache.key(file_path)
+    assert cache.key(file_path) == kb.ParseCache(str(tmp_path / "other")).key(file_path, "", new_data)
@@ -0,0 +1,170 @@
+# 열 단위/행 단위/스트리밍 파싱이 기존 iterrows 루프와 같은 구분/내용/금액을 만드는지 확인합니다.
+import re
+import datetime
+
+import openpyxl
+import pandas as pd
+import pytest
+
+import KISDI_Budget as kb
+from KISDI_Benchmark import make_budget_workbook
+
+ENGINES = ["columnar", "rows", "stream"]
+
+
+def parse_iterrows(file_path):
+    """
+    기존(iterrows) 파싱 루프입니다. 비교 기준으로만 씁니다.
+    """
+    needed = kb.select_needed(pd.read_excel(file_path, header=None))
+    cat_counter = 0
+    group_dict = {}
+    last_main_item = None
+    for _, row in needed.iterrows():
+        raw_cat = str(row["raw_cat"]).strip() if pd.notna(row["raw_cat"]) else ""
+        if re.match(r"^\d+\)", raw_cat):
+            cat_counter += 1
+            middle_name = re.sub(r"^\d+\)", "", raw_cat).strip()
+            group_dict.setdefault(f"{cat_counter}. {middle_name}", {"items": [], "total": 0})
+            continue
+        if not group_dict:
+            continue
+        current_cat = list(group_dict.keys())[-1]
+
+        item_name = str(row["항목명"]).strip()
+        if item_name.startswith("-"):
+            if last_main_item is not None:
+                item_name = last_main_item
+        else:
+            last_main_item = item_name
+
+        amount = row["금액"]
+        if pd.notna(amount) and amount != 0:
+            group_dict[current_cat]["items"].append(kb.make_expression(
+                item_name, row["단가"], row["갯수"], row["갯수단위"], row["횟수1"], row["횟수1단위"],
+                row["횟수2"], row["횟수2단위"], amount))
+            group_dict[current_cat]["total"] += amount
+
+    return [
+        {"구분": cat, "내용": "\n".join(info["items"]),
+         "금액": kb.add_commas(int(info["total"])) if info["total"] != 0 else ""}
+        for cat, info in group_dict.items()
+    ]
+
+
+def as_dicts(parsed_data):
+    return [
+        {"구분": category.label, "내용": "\n".join(lines), "금액": category.total_text()}
+        for category, lines in zip(parsed_data, kb.render_lines(parsed_data))
+    ]
+
+
+def write_rows(file_path, rows):
+    """
+    (B, D, E, F, G, H, I, J, K, L) 값 목록으로 예산 배치의 시트를 만듭니다.
+    """
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["", "예산 내역", None, "항목", "단가", "갯수", None, "횟수", None, "횟수", None, "금액"])
+    for b, *items in rows:
+        ws.append([None, b, None] + items)
+    wb.save(file_path)
+    return file_path
+
+
+def item(name, amount, unit_price=1000, qty=2, qty_unit="명", freq1=3, freq1_unit="월", freq2=None, freq2_unit=None):
+    return [None, name, unit_price, qty, qty_unit, freq1, freq1_unit, freq2, freq2_unit, amount]
+
+
+EDGE_CASES = {
+    # 첫 중분류의 첫 항목부터 "-" 로 시작 (물려받을 항목명이 없음)
+    "leading_dash": [
+        ["1) 인건비"] + item("- 세부", 5000)[1:],
+        item("인쇄비", 2000),
+        item("- 추가", 3000),
+    ],
+    # "-" 행이 중분류 경계를 넘어 앞 중분류의 항목명을 물려받음
+    "dash_across_categories": [
+        ["1) 인건비"] + [None] * 9,
+        item("회의비", 1000),
+        ["2) 여비"] + [None] * 9,
+        item("- 교통", 4000),
+        item("-숙박", 5000, qty_unit=None),
+    ],
+    # 금액이 비어 있거나 0 인 행, 항목이 하나도 남지 않는 중분류
+    "empty_amounts": [
+        ["1) 인건비"] + [None] * 9,
+        item("회의비", None),
+        item("자문료", 0),
+        item("원고료", 1500.5, unit_price=1500.5, qty=1, freq1=None),
+        ["2) 여비"] + [None] * 9,
+        item("여비", 0),
+        ["3) 임차료"] + [None] * 9,
+    ],
+    # 첫 중분류 이전의 항목 행은 버림
+    "rows_before_category": [
+        item("머리말", 9999),
+        item("- 무시", 8888),
+        ["1) 인건비"] + [None] * 9,
+        item("- 세부", 1000),
+        item("임차료", 2000, qty=0, freq1=0, freq2=2, freq2_unit="회"),
+    ],
+    # B열이 숫자인 행(중분류 아님), 숫자 항목명/단위, 숫자로 바꿀 수 없는 단가
+    "numeric_b_cells": [
+        [12] + item("앞행", 100)[1:],
+        ["1) 인건비"] + [None] * 9,
+        [3.5] + item(123, 1000, qty_unit=7)[1:],
+        item("소모품비", 2500, unit_price="1,000", qty=2.5, qty_unit=None, freq1=1.5, freq1_unit=None),
+        ["10)여비"] + [None] * 9,
+        item("여비", -3000, unit_price=-1500, qty=2),
+    ],
+    # 엑셀이 날짜로 저장한 단위 셀 (G/I/K열)
+    "date_units": [
+        ["1) 인건비"] + [None] * 9,
+        item("회의비", 6000, qty_unit=datetime.datetime(2024, 3, 1)),
+        item("자문료", 6000, freq1_unit=datetime.date(2024, 1, 2), freq2=2, freq2_unit=datetime.datetime(2024, 5, 6, 12, 30)),
+    ],
+}
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("case", sorted(EDGE_CASES))
+def test_edge_cases_match_iterrows(tmp_path, case, engine):
+    file_path = write_rows(str(tmp_path / f"{case}.xlsx"), EDGE_CASES[case])
+    assert as_dicts(kb.parse_file(file_path, engine=engine)) == parse_iterrows(file_path)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_generated_workbooks_match_iterrows(tmp_path, seed, engine):
+    file_path = str(tmp_path / f"budget{seed}.xlsx")
+    make_budget_workbook(file_path, categories=6, items=40, dash_ratio=0.4, empty_ratio=0.2, seed=seed)
+    expected = parse_iterrows(file_path)
+    assert expected
+    assert as_dicts(kb.parse_file(file_path, engine=engine)) == expected
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_date_units_round_trip_through_cache(tmp_path, engine):
+    file_path = write_rows(str(tmp_path / "date_units.xlsx"), EDGE_CASES["date_units"])
+    parsed_data = kb.parse_file(file_path, engine=engine)
+    cache = kb.ParseCache(str(tmp_path / "cache"))
+    key = cache.key(file_path)
+    assert cache.store(key, parsed_data)
+    assert cache.load(key) == parsed_data
+    assert as_dicts(cache.load(key)) == parse_iterrows(file_path)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_all_sheets_skip_sheets_without_budget_columns(tmp_path, engine):
+    file_path = write_rows(str(tmp_path / "sheets.xlsx"), EDGE_CASES["dash_across_categories"])
+    wb = openpyxl.load_workbook(file_path)
+    notes = wb.create_sheet("참고")
+    notes.append([None, "1) 참고", "비고"])
+    notes.append([None, "회의비", "메모"])
+    wb.create_sheet("빈 시트")
+    wb.save(file_path)
+
+    parsed_data = kb.parse_file(file_path, engine=engine, all_sheets=True)
+    assert {category.sheet for category in parsed_data} == {"Sheet"}
+    assert as_dicts(parsed_data) == parse_iterrows(file_path)
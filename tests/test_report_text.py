@@ -0,0 +1,69 @@
+# 보고서 내보내기: 줄 단위 출력이 build_final_report 와 같고, 취소/중단 시 임시 파일을 남기지 않는지 확인합니다.
+import os
+import tempfile
+
+import pytest
+
+import KISDI_Budget as kb
+from test_parse_parity import EDGE_CASES, write_rows
+
+
+@pytest.fixture
+def parsed(tmp_path):
+    file_path = write_rows(str(tmp_path / "book.xlsx"), EDGE_CASES["dash_across_categories"])
+    return file_path, kb.parse_file(file_path)
+
+
+def test_text_writer_matches_final_report(tmp_path, parsed):
+    file_path, parsed_data = parsed
+    output_file = str(tmp_path / "out" / "report.txt")
+    os.makedirs(os.path.dirname(output_file))
+    writer = kb.ReportTextWriter(output_file, with_names=False)
+    writer.append(file_path, parsed_data)
+    writer.close()
+    with open(output_file, encoding="utf-8") as f:
+        assert f.read() == kb.build_final_report(parsed_data) + "\n"
+    assert os.listdir(os.path.dirname(output_file)) == ["report.txt"]
+
+
+def test_text_writer_creates_nothing_until_first_append(tmp_path):
+    writer = kb.open_report_writer(str(tmp_path / "report.md"))
+    assert os.listdir(tmp_path) == []
+    writer.discard()
+    assert os.listdir(tmp_path) == []
+
+
+def test_cancelled_job_discards_writer(tmp_path, parsed):
+    file_path, parsed_data = parsed
+    writer = kb.ReportTextWriter(str(tmp_path / "report.txt"))
+    calls = []
+
+    def work(path, timer):
+        writer.append(path, parsed_data)
+        job.cancel()
+        return parsed_data
+
+    def finish(timer):
+        calls.append("finish")
+
+    job = kb.BackgroundJob("통합", [file_path] * 3, work, finish)
+    job.abort = writer.discard
+    job.start()
+    job.thread.join()
+
+    assert calls == []
+    assert os.listdir(tmp_path) == ["book.xlsx"]
+    assert list(job.messages())[-1] == ("done", True)
+
+
+def test_consolidated_writer_discard_removes_temp_file(tmp_path, parsed, monkeypatch):
+    file_path, parsed_data = parsed
+    temp_dir = tmp_path / "temp"
+    temp_dir.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(temp_dir))
+    writer = kb.ConsolidatedWriter(str(tmp_path / "merged.xlsx"), with_index=True)
+    writer.append(file_path, parsed_data)
+    assert [name for name in os.listdir(temp_dir) if name.startswith("openpyxl.")]
+    writer.discard()
+    assert os.listdir(temp_dir) == []
+    assert not os.path.exists(tmp_path / "merged.xlsx")
@@ -0,0 +1,316 @@
+# 변경 감시와 부분 갱신: FileWatcher 가 안정된 파일만 알려주고, 바뀐 중분류만 표/텍스트에서 고치는지 확인합니다.
+import copy
+import os
+
+import pytest
+
+import KISDI_Budget as kb
+from test_parse_parity import EDGE_CASES, item, write_rows
+
+
+class FakeIdle:
+    """
+    after_idle/after_cancel 를 흉내냅니다. run_idle() 로 쌓인 호출을 차례로 실행합니다.
+    """
+    def __init__(self):
+        self.idle = []
+        self.seq = 0
+
+    def after_idle(self, func, *args):
+        self.seq += 1
+        self.idle.append((self.seq, func, args))
+        return self.seq
+
+    def after_cancel(self, idle_id):
+        self.idle = [entry for entry in self.idle if entry[0] != idle_id]
+
+    def run_idle(self):
+        while self.idle:
+            _, func, args = self.idle.pop(0)
+            func(*args)
+
+
+class FakeText(FakeIdle):
+    """
+    Tk Text 를 글자별 태그 집합 목록으로 흉내냅니다. (인덱스는 "1.0", "end", "end-1c" 또는 정수 오프셋 문자열)
+    """
+    def __init__(self):
+        super().__init__()
+        self.chars = []
+
+    def index(self, index):
+        if index == "1.0":
+            return 0
+        if index in ("end", "end-1c"):
+            return len(self.chars)
+        return int(index)
+
+    def insert(self, index, *args):
+        pos = self.index(index)
+        for text, tags in zip(args[::2], args[1::2]):
+            for ch in text:
+                self.chars.insert(pos, (ch, set(tags)))
+                pos += 1
+
+    def delete(self, start, end):
+        del self.chars[self.index(start):self.index(end)]
+
+    def tag_ranges(self, tag):
+        positions = [pos for pos, (_, tags) in enumerate(self.chars) if tag in tags]
+        if not positions:
+            return ()
+        assert positions == list(range(positions[0], positions[-1] + 1)), "태그 범위가 끊어짐"
+        return str(positions[0]), str(positions[-1] + 1)
+
+    def tag_names(self):
+        return sorted({tag for _, tags in self.chars for tag in tags})
+
+    def tag_delete(self, *names):
+        for _, tags in self.chars:
+            tags.difference_update(names)
+
+    def get(self):
+        return "".join(ch for ch, _ in self.chars)
+
+
+class FakeTree(FakeIdle):
+    def __init__(self):
+        super().__init__()
+        self.items = []
+        self.values = {}
+        self.count = 0
+
+    def get_children(self):
+        return tuple(self.items)
+
+    def item(self, iid, values):
+        self.values[iid] = tuple(values)
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.items.remove(iid)
+            del self.values[iid]
+
+    def insert(self, parent, index, values):
+        self.count += 1
+        iid = f"I{self.count}"
+        self.items.insert(len(self.items) if index == "end" else index, iid)
+        self.values[iid] = tuple(values)
+        return iid
+
+    def rows(self):
+        return [self.values[iid] for iid in self.items]
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def configure(self, **kwargs):
+        pass
+
+    def yview(self, *args):
+        pass
+
+
+class FakeScrollbar:
+    def set(self, *args):
+        pass
+
+    def configure(self, **kwargs):
+        pass
+
+
+# ------------------ FileWatcher ------------------ #
+def touch(file_path, content, mtime):
+    with open(file_path, "wb") as f:
+        f.write(content)
+    os.utime(file_path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def watched(tmp_path):
+    file_path = write_rows(str(tmp_path / "book.xlsx"), EDGE_CASES["leading_dash"])
+    watcher = kb.FileWatcher([file_path], debounce=1.0)
+    watcher.prime()
+    return file_path, watcher
+
+
+def test_poll_waits_for_debounce(watched):
+    file_path, watcher = watched
+    assert watcher.poll(now=0) == ([], [])
+
+    write_rows(file_path, EDGE_CASES["dash_across_categories"])
+    assert watcher.poll(now=10) == ([], [])      # 처음 본 변경은 기다림
+    assert watcher.poll(now=10.5) == ([], [])
+    assert watcher.poll(now=11) == ([file_path], [])
+    assert watcher.poll(now=20) == ([], [])      # 한 번만 알려줌
+
+
+def test_poll_restarts_debounce_while_file_keeps_changing(watched):
+    file_path, watcher = watched
+    with open(file_path, "rb") as f:
+        content = f.read()
+    touch(file_path, content + b"\0", 1_000_000_000)
+    assert watcher.poll(now=0) == ([], [])
+    touch(file_path, content, 2_000_000_000)
+    assert watcher.poll(now=1) == ([], [])
+    assert watcher.poll(now=1.5) == ([], [])     # 두 번째 변경부터 다시 셈
+    assert watcher.poll(now=2) == ([file_path], [])
+
+
+def test_poll_skips_locked_file(watched):
+    file_path, watcher = watched
+    touch(file_path, b"not a zip yet", 1_000_000_000)
+    assert kb.is_locked(file_path)
+    assert watcher.poll(now=0) == ([], [])
+    assert watcher.poll(now=5) == ([], [])       # 압축이 완성되지 않은 .xlsx 는 알리지 않음
+
+    write_rows(file_path, EDGE_CASES["leading_dash"])
+    assert watcher.poll(now=6) == ([], [])
+    assert watcher.poll(now=7) == ([file_path], [])
+
+
+def test_poll_reports_removed_and_new_files(tmp_path):
+    first = write_rows(str(tmp_path / "a.xlsx"), EDGE_CASES["leading_dash"])
+    watcher = kb.FileWatcher([str(tmp_path)], debounce=1.0)
+    watcher.prime()
+
+    os.remove(first)
+    second = write_rows(str(tmp_path / "b.xlsx"), EDGE_CASES["leading_dash"])
+    assert watcher.poll(now=0) == ([], [first])
+    assert watcher.poll(now=1) == ([second], [])
+
+    os.remove(second)
+    assert watcher.poll(now=2) == ([], [second])
+    assert watcher.seen == {} and watcher.pending == {}
+
+
+# ------------------ changed_categories ------------------ #
+@pytest.fixture
+def categories(tmp_path):
+    rows = [["1) 인건비"] + [None] * 9, item("회의비", 1000),
+            ["2) 여비"] + [None] * 9, item("교통", 2000),
+            ["3) 임차료"] + [None] * 9, item("임차료", 3000)]
+    return kb.parse_file(write_rows(str(tmp_path / "book.xlsx"), rows))
+
+
+def test_changed_categories_compares_by_position(categories):
+    assert kb.changed_categories(categories, list(categories)) == []
+
+    edited = list(categories)
+    record = edited[1].to_record()
+    record["amounts"] = [amount + 1 for amount in record["amounts"]]
+    edited[1] = kb.Category.from_record(record)
+    assert kb.changed_categories(categories, edited) == [1]
+
+
+def test_changed_categories_added_and_removed(categories):
+    assert kb.changed_categories(categories[:1], categories) == [1, 2]
+    assert kb.changed_categories(categories, categories[:2]) == []
+    assert kb.changed_categories(categories, [categories[0], categories[2]]) == [1]
+    assert kb.changed_categories([], categories) == [0, 1, 2]
+
+
+def test_changed_categories_follows_sheet_headers(categories):
+    old = [copy.copy(category) for category in categories]
+    for category in old:
+        category.sheet = "A"
+    new = [copy.copy(category) for category in old]
+    new[2].sheet = "B"
+    # 시트가 바뀐 중분류는 머리줄이 새로 생기므로 다시 그림
+    assert kb.changed_categories(old, new) == [2]
+
+
+# ------------------ ReportTable ------------------ #
+def make_rows(count, tag="행"):
+    return [(f"{tag}{idx}", "", "") for idx in range(count)]
+
+
+def test_splice_same_count_keeps_items():
+    tree = FakeTree()
+    table = kb.ReportTable(tree, FakeScrollbar())
+    table.set_rows(make_rows(5))
+    items = tree.get_children()
+
+    table.splice(1, 2, make_rows(2, "새"))
+    assert tree.get_children() == items
+    assert tree.rows() == table.rows == [make_rows(5)[0]] + make_rows(2, "새") + make_rows(5)[3:]
+
+
+def test_splice_grows_and_shrinks():
+    tree = FakeTree()
+    table = kb.ReportTable(tree, FakeScrollbar())
+    table.set_rows(make_rows(5))
+    untouched = tree.get_children()[3:]
+
+    table.splice(1, 2, make_rows(3, "새"))
+    assert tree.rows() == table.rows
+    assert len(table.rows) == 6
+    assert tree.get_children()[4:] == untouched
+
+    table.splice(1, 3, [])
+    assert tree.rows() == table.rows == [make_rows(5)[0]] + make_rows(5)[3:]
+
+    table.splice(len(table.rows), 0, make_rows(2, "끝"))
+    assert tree.rows() == table.rows
+    assert table.rows[-2:] == make_rows(2, "끝")
+
+
+def test_splice_while_filling_refills(monkeypatch):
+    monkeypatch.setattr(kb, "TREE_BATCH", 2)
+    tree = FakeTree()
+    table = kb.ReportTable(tree, FakeScrollbar())
+    table.set_rows(make_rows(7))
+    assert len(tree.items) == 2 and table.fill_id is not None
+
+    table.splice(5, 2, make_rows(1, "새"))
+    tree.run_idle()
+    assert table.fill_id is None
+    assert tree.rows() == table.rows == make_rows(5) + make_rows(1, "새")
+
+
+# ------------------ ReportText ------------------ #
+BLOCKS = ["1. 인건비\n- 회의비", "2. 여비\n- 교통\n- 숙박", "3. 임차료"]
+
+
+@pytest.fixture
+def report_text(monkeypatch):
+    monkeypatch.setattr(kb, "TEXT_BATCH", 1)
+    widget = FakeText()
+    view = kb.ReportText(widget)
+    view.set_blocks(BLOCKS)
+    return widget, view
+
+
+def test_set_blocks_fills_in_batches(report_text):
+    widget, view = report_text
+    assert widget.get() == BLOCKS[0]
+    widget.run_idle()
+    assert widget.get() == "\n\n".join(BLOCKS)
+    assert widget.tag_names() == ["cat0", "cat1", "cat2"]
+
+
+def test_replace_after_finish(report_text):
+    widget, view = report_text
+    view.finish()
+    assert widget.idle == []
+    view.replace(1, "2. 여비\n- 항공")
+    view.replace(0, "1. 인건비")
+    expected = ["1. 인건비", "2. 여비\n- 항공", BLOCKS[2]]
+    assert widget.get() == "\n\n".join(expected)
+    assert view.blocks == expected
+    start, end = widget.tag_ranges("cat1")
+    assert widget.get()[int(start):int(end)] == expected[1]
+
+
+def test_truncate_then_append(report_text):
+    widget, view = report_text
+    view.finish()
+    view.truncate(1)
+    assert widget.get() == BLOCKS[0]
+    assert widget.tag_names() == ["cat0"]
+    assert view.blocks == BLOCKS[:1] and view.filled == 1
+
+    view.append("4. 소모품비")
+    view.replace(1, "4. 소모품비\n- 문구")
+    assert widget.get() == BLOCKS[0] + "\n\n4. 소모품비\n- 문구"
+    assert view.blocks == [BLOCKS[0], "4. 소모품비\n- 문구"]